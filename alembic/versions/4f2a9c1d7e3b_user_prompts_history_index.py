@@ -0,0 +1,33 @@
+"""User prompts history index
+
+Revision ID: 4f2a9c1d7e3b
+Revises: cc58b4b96eb4
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c1d7e3b'
+down_revision: Union[str, None] = 'cc58b4b96eb4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_user_prompts_user_id_date_created_id',
+        'user_prompts',
+        ['user_id', sa.text('date_created DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_prompts_user_id_date_created_id', table_name='user_prompts')
@@ -1,19 +1,81 @@
+import math
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.settings.web import WebSettings
+from backend.database.functions import init_engine, dispose_engine
+from backend.database.write_behind import user_prompts_writer
+from backend.database.sessions import run_session_reaper
+from backend.llm.client import init_llm_client, close_llm_client
+from backend.llm.admission import AdmissionRejected
+from backend.llm.resilience import CircuitOpenError, DeadlineExceededError
+from backend.llm.parsing import StoryParseError
+from backend.llm.tokens import load_token_encoding
 from backend import __version__
 
+from .diagnostics import LoopWatchdog, ProfilerMiddleware
+from .metrics import MetricsMiddleware, monitor_event_loop_lag
 from .router_manager import RouterManager
 from .security import SessionMiddleware
+from .passwords import password_hasher
 
 web_settings: WebSettings = WebSettings() #type: ignore
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan. Runs once per worker process.
+    """
+    init_engine()
+    init_llm_client()
+    # Off the event loop: the tokenizer encoding may be downloaded on first load
+    await asyncio.to_thread(load_token_encoding)
+
+    tasks: list[asyncio.Task] = []
+    if web_settings.WEB_SESSION_REAPER_INTERVAL_SECONDS > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_session_reaper(
+                    web_settings.WEB_SESSION_REAPER_INTERVAL_SECONDS,
+                    web_settings.WEB_SESSION_REAPER_BATCH_SIZE,
+                )
+            )
+        )
+    if web_settings.WEB_EVENT_LOOP_LAG_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(monitor_event_loop_lag(web_settings.WEB_EVENT_LOOP_LAG_INTERVAL_SECONDS)))
+
+    watchdog = None
+    if web_settings.WEB_DIAGNOSTICS:
+        watchdog = LoopWatchdog(web_settings.WEB_DIAGNOSTICS_BLOCK_THRESHOLD_SECONDS)
+        watchdog.start()
+
+    try:
+        yield
+    finally:
+        if watchdog is not None:
+            await watchdog.stop()
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        await close_llm_client()
+        # Queued stories must be written before the pool goes away
+        await user_prompts_writer.close()
+        await dispose_engine()
+        password_hasher.shutdown()
+
+
 app = FastAPI(
     title=web_settings.WEB_TITLE,
     version=__version__,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -28,6 +90,15 @@ for router in RouterManager.all().values():
     app.include_router(router)
 
 app.add_middleware(SessionMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+if web_settings.WEB_DIAGNOSTICS and web_settings.WEB_DIAGNOSTICS_PROFILE_TOKEN:
+    app.add_middleware(
+        ProfilerMiddleware,
+        token=web_settings.WEB_DIAGNOSTICS_PROFILE_TOKEN,
+        directory=web_settings.WEB_DIAGNOSTICS_PROFILE_DIR,
+        interval=web_settings.WEB_DIAGNOSTICS_PROFILE_INTERVAL_SECONDS,
+    )
 
 # Exceptions handlers --------------------------------------------------------------
 @app.exception_handler(HTTPException)
@@ -38,6 +109,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     response = JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
     
     if response.status_code == 401:
@@ -45,3 +117,49 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         response.delete_cookie("profile")
     
     return response
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """
+    LLM call limits exhausted.
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, try again later"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """
+    LLM upstream degraded, failing fast until the circuit breaker lets calls through.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Story generation temporarily unavailable"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    """
+    LLM call deadline exceeded, retries included.
+    """
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "Story generation timed out"},
+    )
+
+
+@app.exception_handler(StoryParseError)
+async def story_parse_error_handler(request: Request, exc: StoryParseError):
+    """
+    LLM output unusable even after repair and a re-ask.
+    """
+    return JSONResponse(
+        status_code=502,
+        content={"detail": "Story generation returned an invalid response"},
+    )
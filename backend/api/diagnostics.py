@@ -0,0 +1,177 @@
+"""
+Diagnostics mode (`WEB_DIAGNOSTICS`), off by default. When off nothing here runs.
+
+- `LoopWatchdog` logs the stack of the event loop thread whenever the loop stops
+  running callbacks for longer than a threshold, pointing at the blocking call (a sync
+  HTTP client, bcrypt, heavy JSON...).
+- `ProfilerMiddleware` samples the event loop thread while a request is in flight when
+  the request carries the profile header with the configured token, and writes the
+  samples as collapsed stacks (`frame;frame;frame count`), the input format of
+  flamegraph.pl and speedscope. Concurrent requests run on the same thread and show
+  up in the profile too, profile on a quiet worker.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import traceback
+from collections import Counter
+from datetime import datetime, UTC
+from pathlib import Path
+from time import monotonic
+from types import FrameType
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+__all__ = ["LoopWatchdog", "ProfilerMiddleware", "PROFILE_HEADER"]
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-sorna-profile"
+PROFILE_FILE_HEADER = "x-sorna-profile-file"
+
+
+class LoopWatchdog:
+    """
+    A heartbeat task updates a timestamp on the loop, a daemon thread checks it. When
+    the heartbeat is late by more than `threshold` the loop thread's current stack is
+    logged, once per blocking episode.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.blocks = 0
+        self._beat = monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._beat = monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self) -> None:
+        reported_beat = None
+
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._beat
+            blocked = monotonic() - beat
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore[arg-type]
+            if frame is None:
+                continue
+
+            reported_beat = beat
+            self.blocks += 1
+            logger.warning(
+                "Event loop blocked for over %.3fs, loop thread stack:\n%s",
+                blocked,
+                "".join(traceback.format_stack(frame)),
+            )
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class _Sampler:
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self._stop.wait(self.interval)
+
+
+class ProfilerMiddleware:
+    """
+    Profile requests sent with `X-Sorna-Profile: <token>`. The response carries the
+    written file name in `X-Sorna-Profile-File`.
+    """
+
+    def __init__(self, app: ASGIApp, token: str, directory: str, interval: float) -> None:
+        self.app = app
+        self.token = token.encode("latin-1")
+        self.directory = Path(directory)
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.token or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = f"{datetime.now(UTC):%Y%m%dT%H%M%S}-{scope['method']}-{route}-{uuid4().hex[:8]}.collapsed"
+
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_FILE_HEADER, filename)
+            await send(message)
+
+        sampler = _Sampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            # Joining the sampler blocks until its current sample is done, keep it off the loop
+            await asyncio.to_thread(sampler.stop)
+            await asyncio.to_thread(self._write, filename, sampler.stacks)
+
+    def _requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode("latin-1"):
+                return secrets.compare_digest(value, self.token)
+
+        return False
+
+    def _write(self, filename: str, stacks: Counter[str]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / filename, "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        logger.info("Request profile written to %s", self.directory / filename)
@@ -0,0 +1,86 @@
+import asyncio
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.extra.metrics import Gauge, Histogram
+
+__all__ = [
+    "MetricsMiddleware",
+    "monitor_event_loop_lag",
+    "HTTP_REQUEST_DURATION",
+    "SESSION_MIDDLEWARE_DURATION",
+    "PASSWORD_HASH_DURATION",
+    "EVENT_LOOP_LAG",
+]
+
+HTTP_REQUEST_DURATION = Histogram(
+    "sorna_http_request_duration_seconds",
+    "HTTP request latency, until the last byte of the response",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "sorna_http_requests_in_progress",
+    "HTTP requests being served",
+)
+SESSION_MIDDLEWARE_DURATION = Histogram(
+    "sorna_session_middleware_duration_seconds",
+    "Time spent decoding and renewing session cookies",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "sorna_password_hash_duration_seconds",
+    "bcrypt time per operation, excluding the wait for a thread",
+    ("operation",),
+)
+EVENT_LOOP_LAG = Histogram(
+    "sorna_event_loop_lag_seconds",
+    "Delay of the event loop in running a scheduled callback",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+class MetricsMiddleware:
+    """
+    Record the latency of every HTTP request labelled by its route template (e.g.
+    `/stories/{story_id}`), so label values stay bounded. Requests that match no route
+    are labelled `unmatched`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, status_code).observe(perf_counter() - start)
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """
+    Sleep `interval` seconds in a loop and record how late each wake up is. Sustained
+    lag means something blocks the loop (CPU work or blocking I/O in a coroutine).
+    """
+    loop = asyncio.get_running_loop()
+
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from backend.settings.web import WebSettings
+
+from .metrics import PASSWORD_HASH_DURATION
+
+__all__ = ["PasswordHasher", "password_hasher"]
+
+web_settings: WebSettings = WebSettings()  # type: ignore
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords with bcrypt on a bounded thread pool.
+
+    bcrypt releases the GIL, so hashing runs in parallel with the event loop instead of
+    stalling it. When `max_pending` operations are already queued or running, new ones
+    are rejected with a 429 so login bursts are shed instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hasher",
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> bytes:
+        return await self._run("hash", self._hash, password.encode("utf-8"), self.rounds)
+
+    async def check(self, password: str, hashed: bytes) -> bool:
+        return await self._run("check", bcrypt.checkpw, password.encode("utf-8"), hashed)
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        """
+        Whether `hashed` was produced with a different cost factor than the configured one.
+        """
+        try:
+            return int(hashed.split(b"$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    @staticmethod
+    def _hash(password: bytes, rounds: int) -> bytes:
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    @staticmethod
+    def _timed(operation: str, func, *args):
+        with PASSWORD_HASH_DURATION.labels(operation).time():
+            return func(*args)
+
+    async def _run(self, operation: str, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, try again later",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+        # The slot is released when the thread finishes, even if the request is cancelled
+        future = self.executor.submit(self._timed, operation, func, *args)
+        future.add_done_callback(self._release)
+
+        return await asyncio.wrap_future(future)
+
+
+password_hasher = PasswordHasher(
+    rounds=web_settings.WEB_BCRYPT_ROUNDS,
+    workers=web_settings.WEB_PASSWORD_HASH_WORKERS,
+    max_pending=web_settings.WEB_PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,5 +1,8 @@
 from . import (
     auth,
     user_profile,
-    prompts
-)
\ No newline at end of file
+    prompts,
+    jobs,
+    monitoring,
+    metrics,
+)
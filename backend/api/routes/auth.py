@@ -1,13 +1,13 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from typing import Annotated
 
-import bcrypt
-from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import APIRouter, Depends, Request, status, HTTPException
 from pydantic import BaseModel, StringConstraints
 
 from backend.api.security import get_authenticated_user, AuthenticatedUser, SessionMiddleware
 from backend.api.router_manager import RouterManager
+from backend.api.passwords import password_hasher
 from backend.database.functions import get_db_session
 from backend.database.tables import UsersTable
 
@@ -44,30 +44,26 @@ class RegisterResponseModel(BaseModel):
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=RegisterResponseModel)
 async def register(form: RegisterFormModel) -> RegisterResponseModel:
+    user_pwd = await password_hasher.hash(form.password)
+
     async with get_db_session() as session:
-        # Check if the username or email already exists
-        existing_user = await session.execute(
-            select(UsersTable).where(
-                (UsersTable.username == form.username) | (UsersTable.email == form.email)
-            ).limit(1)
+        # The unique constraints on username and email reject duplicates
+        result = await session.execute(
+            insert(UsersTable)
+            .values(id=uuid4(), username=form.username, email=form.email, password=user_pwd)
+            .on_conflict_do_nothing()
+            .returning(UsersTable.id)
         )
-        existing_user = existing_user.scalars().first()
-        if existing_user:
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username or email already exists",
             )
-        user_pwd = bcrypt.hashpw(form.password.encode("utf-8"), bcrypt.gensalt())
-        new_user = UsersTable(
-            username=form.username,
-            password=user_pwd,
-            email=form.email,
-        )
-        session.add(new_user)
         await session.commit()
-        await session.refresh(new_user)
-        return RegisterResponseModel(
-            id=new_user.id,
-            username=new_user.username,
-            email=new_user.email,
-        )
\ No newline at end of file
+
+    return RegisterResponseModel(
+        id=user_id,
+        username=form.username,
+        email=form.email,
+    )
@@ -0,0 +1,150 @@
+import asyncio
+from time import monotonic
+from typing import Annotated, AsyncIterator
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from backend.api.router_manager import RouterManager
+from backend.api.routes.prompts import (
+    GeneratePromptFormModel,
+    GeneratePromptResponseModel,
+    get_comedian_and_prompt,
+    server_sent_event,
+)
+from backend.api.security import AuthenticatedUser, get_authenticated_user
+from backend.database.enums.jobs import JobStatusStrEnum
+from backend.database.functions import get_db_session
+from backend.database.tables import StoryJobsTable, UserPromptsTable
+from backend.jobs.queue import enqueue_job, jobs_settings
+
+router = RouterManager.add_router(APIRouter(prefix="/stories/jobs", tags=["jobs"]))
+
+
+class StoryJobModel(BaseModel):
+    """
+    Story generation job model. `story` is set once the job succeeded.
+    """
+
+    id: UUID
+    status: JobStatusStrEnum
+    attempts: int
+    error: str | None
+    date_created: str
+    date_updated: str
+    story: GeneratePromptResponseModel | None = None
+
+
+async def get_job(job_id: UUID, user_id: UUID) -> StoryJobModel:
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(StoryJobsTable, UserPromptsTable)
+            .outerjoin(UserPromptsTable, UserPromptsTable.id == StoryJobsTable.story_id)
+            .where(StoryJobsTable.id == job_id, StoryJobsTable.user_id == user_id)
+        )
+        row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    job, story = row
+    return StoryJobModel(
+        id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+        date_created=job.date_created.isoformat(),
+        date_updated=job.date_updated.isoformat(),
+        story=None if story is None else GeneratePromptResponseModel(
+            title=story.title,
+            story=story.story,
+            comedian=story.comedian,
+            date_created=story.date_created.isoformat(),
+        ),
+    )
+
+
+@router.post("", response_model=StoryJobModel, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    form: GeneratePromptFormModel,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+):
+    """
+    Queue a story generation, processed by `python -m backend app worker`.
+    """
+    get_comedian_and_prompt(form)
+    job = await enqueue_job(current_user.id, form.prompt, form.comedian, use_cache=form.cache)
+
+    return StoryJobModel(
+        id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+        date_created=job.date_created.isoformat(),
+        date_updated=job.date_updated.isoformat(),
+    )
+
+
+@router.get("/{job_id}", response_model=StoryJobModel, status_code=status.HTTP_200_OK)
+async def read_job(
+    job_id: UUID,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+):
+    """
+    Get a story generation job.
+    """
+    return await get_job(job_id, current_user.id)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def read_job_events(
+    job_id: UUID,
+    request: Request,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+):
+    """
+    Follow a story generation job as Server-Sent Events.
+
+    Emits a `status` event on every status change, then `done` with the job once it
+    succeeded or `error` once it failed. The stream ends with a `timeout` event with the
+    job if it isn't finished after `JOBS_EVENTS_MAX_SECONDS`, the client can reconnect.
+    """
+    job = await get_job(job_id, current_user.id)
+    deadline = monotonic() + jobs_settings.JOBS_EVENTS_MAX_SECONDS
+
+    async def events() -> AsyncIterator[str]:
+        current = job
+        last_status = None
+
+        while True:
+            if current.status != last_status:
+                last_status = current.status
+                yield server_sent_event("status", {"status": current.status})
+
+            if current.status == JobStatusStrEnum.SUCCEEDED:
+                yield server_sent_event("done", current.model_dump(mode="json"))
+                return
+            if current.status == JobStatusStrEnum.FAILED:
+                yield server_sent_event("error", current.model_dump(mode="json"))
+                return
+            if monotonic() >= deadline:
+                yield server_sent_event("timeout", current.model_dump(mode="json"))
+                return
+
+            await asyncio.sleep(jobs_settings.JOBS_POLL_INTERVAL_SECONDS)
+            # Stop polling for clients that went away
+            if await request.is_disconnected():
+                return
+            current = await get_job(job_id, current_user.id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import PlainTextResponse
+
+from backend.api.passwords import password_hasher
+from backend.api.router_manager import RouterManager
+from backend.api.security import require_monitoring_token, session_cache
+from backend.database.write_behind import user_prompts_writer
+from backend.extra.metrics import StatsGauges, registry
+from backend.llm.admission import admission
+from backend.llm.cache import get_generation_cache
+from backend.llm.client import get_llm_client
+from backend.llm.parsing import story_parser
+from backend.llm.stories import story_flights
+
+router = RouterManager.add_router(
+    APIRouter(prefix="", tags=["monitoring"], dependencies=[Depends(require_monitoring_token)])
+)
+
+
+def get_generation_cache_stats() -> dict:
+    cache = get_generation_cache()
+    return cache.stats() if cache is not None else {}
+
+
+# Counters kept by each component, exposed as gauges read at scrape time
+StatsGauges("sorna_session_cache", "Session cache", session_cache.stats)
+StatsGauges("sorna_generation_cache", "Generation cache", get_generation_cache_stats)
+StatsGauges("sorna_single_flight", "Coalesced story generations", story_flights.stats)
+StatsGauges("sorna_admission", "LLM admission control", admission.stats)
+StatsGauges("sorna_llm_resilience", "LLM retries, hedging and circuit breaker", lambda: get_llm_client().resilience.stats())
+StatsGauges("sorna_story_parsing", "Story output parsing", story_parser.stats)
+StatsGauges("sorna_write_behind", "Stories write-behind buffer", user_prompts_writer.stats)
+StatsGauges("sorna_password_hasher", "Password hashing", lambda: {"pending": password_hasher.pending})
+
+
+@router.get("/metrics", response_class=PlainTextResponse, status_code=status.HTTP_200_OK)
+async def get_metrics():
+    """
+    Metrics of this worker process in the Prometheus text format. Requires
+    `WEB_MONITORING_TOKEN` as bearer token (`authorization` in the Prometheus scrape config).
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,164 @@
+from fastapi import APIRouter, Depends, status
+from pydantic import BaseModel
+
+from backend.api.router_manager import RouterManager
+from backend.api.security import require_monitoring_token, session_cache
+from backend.database.write_behind import user_prompts_writer
+from backend.llm.admission import admission
+from backend.llm.cache import get_generation_cache
+from backend.llm.client import get_llm_client
+from backend.llm.parsing import story_parser
+from backend.llm.stories import story_flights
+
+# Internal statistics, only served with WEB_MONITORING_TOKEN as bearer token
+router = RouterManager.add_router(
+    APIRouter(
+        prefix="/monitoring",
+        tags=["monitoring"],
+        dependencies=[Depends(require_monitoring_token)],
+    )
+)
+
+
+class CacheStatsModel(BaseModel):
+    """
+    In-process cache statistics (per worker).
+    """
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+@router.get("/session_cache", response_model=CacheStatsModel, status_code=status.HTTP_200_OK)
+async def get_session_cache_stats():
+    """
+    Get session cache statistics.
+    """
+    return CacheStatsModel(**session_cache.stats())
+
+
+class GenerationCacheStatsModel(BaseModel):
+    """
+    Generated stories cache statistics (per worker).
+    """
+
+    backend: str
+    hits: int
+    misses: int
+
+
+@router.get("/generation_cache", response_model=GenerationCacheStatsModel, status_code=status.HTTP_200_OK)
+async def get_generation_cache_stats():
+    """
+    Get generated stories cache statistics.
+    """
+    cache = get_generation_cache()
+    if cache is None:
+        return GenerationCacheStatsModel(backend="none", hits=0, misses=0)
+
+    return GenerationCacheStatsModel(backend=type(cache).__name__, **cache.stats())
+
+
+class SingleFlightStatsModel(BaseModel):
+    """
+    Coalesced generation statistics (per worker).
+    """
+
+    executions: int
+    coalesced: int
+    in_flight: int
+
+
+@router.get("/single_flight", response_model=SingleFlightStatsModel, status_code=status.HTTP_200_OK)
+async def get_single_flight_stats():
+    """
+    Get statistics of identical generation requests merged onto one upstream call.
+    """
+    return SingleFlightStatsModel(**story_flights.stats())
+
+
+class AdmissionStatsModel(BaseModel):
+    """
+    LLM admission control statistics (per worker).
+    """
+
+    admitted: int
+    rejected: int
+    waiting: int
+    in_flight: int
+    tokens_admitted: int
+    users: int
+    requests_available: float
+    tokens_available: float
+
+
+@router.get("/admission", response_model=AdmissionStatsModel, status_code=status.HTTP_200_OK)
+async def get_admission_stats():
+    """
+    Get LLM admission control statistics.
+    """
+    return AdmissionStatsModel(**admission.stats())
+
+
+class ResilienceStatsModel(BaseModel):
+    """
+    LLM resilience policy statistics (per worker).
+    """
+
+    calls: int
+    retries: int
+    hedges: int
+    deadlines_exceeded: int
+    circuit_state: str
+    circuit_trips: int
+    circuit_rejected: int
+
+
+@router.get("/resilience", response_model=ResilienceStatsModel, status_code=status.HTTP_200_OK)
+async def get_resilience_stats():
+    """
+    Get LLM retry, hedging and circuit breaker statistics.
+    """
+    return ResilienceStatsModel(**get_llm_client().resilience.stats())
+
+
+class StoryParsingStatsModel(BaseModel):
+    """
+    LLM story output parsing statistics (per worker).
+    """
+
+    outputs: int
+    repaired: int
+    invalid: int
+    reasks: int
+    repair_rate: float
+    reask_rate: float
+
+
+@router.get("/story_parsing", response_model=StoryParsingStatsModel, status_code=status.HTTP_200_OK)
+async def get_story_parsing_stats():
+    """
+    Get how often story outputs needed a local repair or a re-ask.
+    """
+    return StoryParsingStatsModel(**story_parser.stats())
+
+
+class WriteBehindStatsModel(BaseModel):
+    """
+    Stories write-behind buffer statistics (per worker).
+    """
+
+    rows: int
+    batches: int
+    pending: int
+
+
+@router.get("/write_behind", response_model=WriteBehindStatsModel, status_code=status.HTTP_200_OK)
+async def get_write_behind_stats():
+    """
+    Get stories write-behind buffer statistics.
+    """
+    return WriteBehindStatsModel(**user_prompts_writer.stats())
@@ -1,14 +1,20 @@
+import asyncio
 import json
-from uuid import UUID
-from typing import Annotated
+import logging
+import zlib
+from time import perf_counter
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import AsyncExitStack
+from datetime import datetime
+from uuid import UUID, uuid4
+from typing import Annotated, Any, AsyncIterator
 
 import bcrypt
-from openai import OpenAI
-from fastapi import APIRouter, Depends, status, HTTPException
-from pydantic import BaseModel, StringConstraints, Field
-from sqlalchemy import func, select, insert
+from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, StringConstraints, Field, field_validator
+from sqlalchemy import delete, func, select, insert, tuple_
 
-from backend.settings.openai import OpenaiSettings
 from backend.database.functions import get_db_session
 from backend.database.tables import UsersTable, SessionsTable
 from backend.api.security import get_authenticated_user, AuthenticatedUser
@@ -16,8 +22,32 @@ from backend.api.router_manager import RouterManager
 from backend.api.security import SessionMiddleware
 from backend.database.enums.comedians import ComedianStrEnum
 from backend.database.tables import UserPromptsTable  
-from backend.comedians.base import MetaComedian
+from backend.comedians.base import MetaComedian, BaseComedian
 from backend.database.functions import get_db_session
+from backend.database.write_behind import user_prompts_writer
+from backend.llm.messages import (
+    STORY_MODEL,
+    STORY_MAX_TOKENS,
+    STORY_TEMPERATURE,
+    build_story_messages,
+    estimate_story_tokens,
+)
+from backend.llm.admission import AdmissionRejected, admission
+from backend.llm.client import LLMClient, get_llm_client
+from backend.llm.metrics import LLM_REQUEST_DURATION, record_llm_usage
+from backend.llm.parsing import STORY_RESPONSE_FORMAT, StoryParseError
+from backend.llm.resilience import CircuitOpenError, DeadlineExceededError
+from backend.llm.tokens import count_tokens
+from backend.settings.openai import OpenaiSettings
+from backend.llm.stream import StoryStreamParser
+from backend.llm.stories import GeneratedStory, cache_story, generate_story, get_cached_story
+
+logger = logging.getLogger(__name__)
+
+openai_settings: OpenaiSettings = OpenaiSettings() # type: ignore
+
+EXPORT_BATCH_SIZE = 500
+GENERATE_BATCH_MAX_ITEMS = 20
 
 router = RouterManager.add_router(APIRouter(prefix="/stories", tags=["stories"]))
 
@@ -28,6 +58,7 @@ class GeneratePromptFormModel(BaseModel):
 
     prompt: str
     comedian: ComedianStrEnum
+    cache: bool = True # Set to false to always request a new generation
 
 class GeneratePromptResponseModel(BaseModel):
     """
@@ -38,14 +69,7 @@ class GeneratePromptResponseModel(BaseModel):
     comedian: ComedianStrEnum
     date_created: str
 
-@router.post("/generate", response_model=GeneratePromptResponseModel, status_code=status.HTTP_201_CREATED)
-async def generate_prompt(
-    form: GeneratePromptFormModel,
-    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
-):
-    """
-    Generate a prompt.
-    """
+def get_comedian_and_prompt(form: GeneratePromptFormModel) -> tuple[type[BaseComedian], str]:
     comedian = MetaComedian.get_comedian(form.comedian)
     if not comedian:
         raise HTTPException(
@@ -58,67 +82,344 @@ async def generate_prompt(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Prompt is required",
         )
-    prompt_to_generate = comedian.get_context() + prompt
-    
-    client = OpenAI(api_key=OpenaiSettings().OPENAI_API_KEY)
+    if count_tokens(prompt) > openai_settings.OPENAI_PROMPT_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Prompt too long, the limit is {openai_settings.OPENAI_PROMPT_MAX_TOKENS} tokens",
+        )
+    return comedian, prompt
+
+
+def get_story_llm_client() -> LLMClient:
+    client = get_llm_client()
     if not client.api_key:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OpenAI API key not set",
         )
-    
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "Eres un asistente que responde solo en formato JSON válido."},
-            {"role": "user", "content": (
-                "Tu respuesta debe ser un objeto JSON válido con exactamente dos claves: "
-                "\"title\" y \"story\". Ambas claves deben estar presentes SIEMPRE. "
-                "\"title\" debe ser una cadena corta y descriptiva del contenido de la historia. "
-                "\"story\" debe ser una cadena que contenga la historia generada. "
-                "No incluyas ningún texto fuera del objeto JSON. No uses bloques de código. "
-                "Ejemplo de formato: {\"title\": \"El despertar\", \"story\": \"Un día, el sol no salió...\"}"
-            )},
-            {"role": "user", "content": prompt_to_generate}
-        ],
-        max_tokens=1024,
-        temperature=0.7,
-    )
-    story = response.choices[0].message.content or "No story generated"
-    story_response = json.loads(story)
+    return client
+
 
+async def save_story(
+    current_user: AuthenticatedUser,
+    form: GeneratePromptFormModel,
+    story_response: dict[str, str],
+) -> GeneratePromptResponseModel:
+    """
+    Store a story through the write-behind buffer, returns once it is committed.
+    """
+    title = story_response.get("title") or "No title generated"
+    story = story_response.get("story") or "No story generated"
 
-    new_prompt = UserPromptsTable(
-        user_id=current_user.id,
-        prompt=prompt,
+    row = await user_prompts_writer.insert(
+        {
+            "id": uuid4(),
+            "user_id": current_user.id,
+            "prompt": form.prompt,
+            "comedian": form.comedian,
+            "date_created": func.now(),
+            "title": title,
+            "story": story,
+        }
+    )
+
+    return GeneratePromptResponseModel(
+        title=title,
+        story=story,
         comedian=form.comedian,
-        date_created=func.now(),
-        title=story_response.get("title", "No title generated"),
-        story=story_response.get("story", "No story generated"),
+        date_created=row.date_created.isoformat(),
+    )
+
+
+@router.post("/generate", response_model=GeneratePromptResponseModel, status_code=status.HTTP_201_CREATED)
+async def generate_prompt(
+    form: GeneratePromptFormModel,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+    client: Annotated[LLMClient, Depends(get_story_llm_client)],
+):
+    """
+    Generate a prompt.
+    """
+    comedian, prompt = get_comedian_and_prompt(form)
+
+    story = await generate_story(client, comedian, prompt, current_user.id, use_cache=form.cache)
+
+    return await save_story(current_user, form, story.as_dict())
+
+
+def server_sent_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate/stream", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def generate_prompt_stream(
+    form: GeneratePromptFormModel,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+    client: Annotated[LLMClient, Depends(get_story_llm_client)],
+):
+    """
+    Generate a prompt, streaming it as Server-Sent Events.
+
+    Emits `title` and `story` events with text deltas while the model writes, then a
+    `done` event with the stored story (same shape as `/generate`), or an `error` event.
+    """
+    comedian, prompt = get_comedian_and_prompt(form)
+
+    if form.cache and (cached_story := await get_cached_story(comedian, prompt)) is not None:
+        async def cached_events() -> AsyncIterator[str]:
+            yield server_sent_event("title", {"delta": cached_story.title})
+            yield server_sent_event("story", {"delta": cached_story.story})
+            story = await save_story(current_user, form, cached_story.as_dict())
+            yield server_sent_event("done", story.model_dump(mode="json"))
+
+        return StreamingResponse(
+            cached_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # Open the upstream stream before responding so upstream errors keep their status code
+    exit_stack = AsyncExitStack()
+    start: float | None = None
+    try:
+        await exit_stack.enter_async_context(admission.admit_user(current_user.id))
+        start = perf_counter()
+        stream = await exit_stack.enter_async_context(
+            client.stream_completion(
+                build_story_messages(comedian, prompt),
+                estimate_story_tokens(comedian, prompt),
+                model=STORY_MODEL,
+                max_tokens=STORY_MAX_TOKENS,
+                temperature=STORY_TEMPERATURE,
+                response_format=STORY_RESPONSE_FORMAT,
+                stream_options={"include_usage": True},
+            )
+        )
+    except:
+        if start is not None:
+            LLM_REQUEST_DURATION.labels(comedian.name, "stream", "error").observe(perf_counter() - start)
+        await exit_stack.aclose()
+        raise
+
+    assert start is not None
+
+    async def events() -> AsyncIterator[str]:
+        parser = StoryStreamParser()
+        outcome = "error"
+        duration: float | None = None
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    # Last chunk when usage is requested, it has no choices
+                    record_llm_usage(comedian.name, chunk.usage)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for field, text in parser.feed(chunk.choices[0].delta.content):
+                    yield server_sent_event(field, {"delta": text})
+
+            duration = perf_counter() - start
+            generated = GeneratedStory(**parser.result())
+            story = await save_story(current_user, form, generated.as_dict())
+            # Only a stored story is a success, and only a stored story is worth caching
+            outcome = "success"
+
+            if form.cache:
+                await cache_story(comedian, prompt, generated)
+
+            yield server_sent_event("done", story.model_dump(mode="json"))
+
+        except Exception:
+            logger.exception("Story stream failed")
+            yield server_sent_event("error", {"detail": "Story generation failed"})
+
+        finally:
+            LLM_REQUEST_DURATION.labels(comedian.name, "stream", outcome).observe(
+                perf_counter() - start if duration is None else duration
+            )
+            await exit_stack.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+def get_batch_max_items() -> int:
+    """
+    A batch is charged its item count against the user's requests per minute at once: it
+    can't be bigger than that budget, or it would never be admitted.
+    """
+    return max(1, min(GENERATE_BATCH_MAX_ITEMS, openai_settings.OPENAI_USER_REQUESTS_PER_MINUTE))
+
+class GenerateBatchFormModel(BaseModel):
+    """
+    Generate batch model.
+    """
+    items: list[GeneratePromptFormModel] = Field(min_length=1)
+
+    @field_validator("items")
+    @classmethod
+    def check_items_length(cls, items: list[GeneratePromptFormModel]) -> list[GeneratePromptFormModel]:
+        max_items = get_batch_max_items()
+        if len(items) > max_items:
+            raise ValueError(f"A batch has at most {max_items} items")
+        return items
+
+class GenerateBatchItemModel(BaseModel):
+    """
+    Result of a batch item, in the same position as in the request: the stored story
+    or the error that prevented it.
+    """
+    status_code: int
+    story: GeneratePromptResponseModel | None = None
+    error: str | None = None
+
+class GenerateBatchResponseModel(BaseModel):
+    """
+    Generate batch response model.
+    """
+    items: list[GenerateBatchItemModel]
+    succeeded: int
+    failed: int
+
+def get_batch_item_error(exc: Exception) -> tuple[int, str]:
+    """
+    Status code and detail of a failed batch item, as the single item endpoint would answer.
+    """
+    match exc:
+        case HTTPException():
+            return exc.status_code, str(exc.detail)
+        case AdmissionRejected():
+            return status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests, try again later"
+        case CircuitOpenError():
+            return status.HTTP_503_SERVICE_UNAVAILABLE, "Story generation temporarily unavailable"
+        case DeadlineExceededError():
+            return status.HTTP_504_GATEWAY_TIMEOUT, "Story generation timed out"
+        case StoryParseError():
+            return status.HTTP_502_BAD_GATEWAY, "Story generation returned an invalid response"
+
+    logger.error("Batch item failed", exc_info=exc)
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, "Story generation failed"
+
+async def save_stories(
+    current_user: AuthenticatedUser,
+    stories: list[tuple[GeneratePromptFormModel, GeneratedStory]],
+) -> list[GeneratePromptResponseModel]:
+    """
+    Store several stories with a single INSERT ... RETURNING.
+    """
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": current_user.id,
+            "prompt": form.prompt,
+            "comedian": form.comedian,
+            "date_created": func.now(),
+            "title": story.title or "No title generated",
+            "story": story.story or "No story generated",
+        }
+        for form, story in stories
+    ]
+
     async with get_db_session() as session:
-        session.add(new_prompt)
+        result = await session.execute(
+            insert(UserPromptsTable)
+            .values(rows)
+            .returning(UserPromptsTable.id, UserPromptsTable.date_created)
+        )
+        dates_created = {story_id: date_created for story_id, date_created in result.all()}
         await session.commit()
-        await session.refresh(new_prompt)
 
-    return GeneratePromptResponseModel(
-        title=story_response.get("title", "No title generated"),
-        story=story_response.get("story", "No story generated"),
-        comedian=form.comedian,
-        date_created=new_prompt.date_created.isoformat(),
+    return [
+        GeneratePromptResponseModel(
+            title=row["title"],
+            story=row["story"],
+            comedian=row["comedian"],
+            date_created=dates_created[row["id"]].isoformat(),
+        )
+        for row in rows
+    ]
+
+@router.post(
+    "/generate/batch",
+    response_model=GenerateBatchResponseModel,
+    status_code=status.HTTP_200_OK,
+)
+async def generate_prompt_batch(
+    form: GenerateBatchFormModel,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+    client: Annotated[LLMClient, Depends(get_story_llm_client)],
+):
+    """
+    Generate several stories in one call.
+
+    The batch goes through the per user LLM limits once, as many requests as it has
+    items (a 429 rejects it whole). Items are generated concurrently, at most as many at
+    a time as the user concurrency slots it holds, and the successful ones are stored with
+    a single insert. A failed item doesn't fail the batch, its error is reported in its place.
+    """
+    async def generate_item(
+        item: GeneratePromptFormModel,
+        semaphore: asyncio.Semaphore,
+    ) -> GeneratedStory:
+        comedian, prompt = get_comedian_and_prompt(item)
+        async with semaphore:
+            return await generate_story(
+                client,
+                comedian,
+                prompt,
+                current_user.id,
+                use_cache=item.cache,
+                user_admitted=True,
+            )
+
+    async with admission.admit_user(
+        current_user.id, requests=len(form.items), concurrency=len(form.items)
+    ) as slots:
+        semaphore = asyncio.Semaphore(slots)
+        outcomes = await asyncio.gather(
+            *(generate_item(item, semaphore) for item in form.items),
+            return_exceptions=True,
+        )
+
+    generated = [
+        (item, outcome)
+        for item, outcome in zip(form.items, outcomes)
+        if isinstance(outcome, GeneratedStory)
+    ]
+    stored = iter(await save_stories(current_user, generated) if generated else [])
+
+    results: list[GenerateBatchItemModel] = []
+    for outcome in outcomes:
+        if isinstance(outcome, GeneratedStory):
+            results.append(
+                GenerateBatchItemModel(status_code=status.HTTP_201_CREATED, story=next(stored))
+            )
+        elif isinstance(outcome, Exception):
+            status_code, error = get_batch_item_error(outcome)
+            results.append(GenerateBatchItemModel(status_code=status_code, error=error))
+        else:
+            raise outcome
+
+    return GenerateBatchResponseModel(
+        items=results,
+        succeeded=len(generated),
+        failed=len(results) - len(generated),
     )
 
 class ComedianInfo(BaseModel):
     name: ComedianStrEnum
     name_comedian: str
+    template_tokens: int # Tokens of the comedian template, sent before every prompt
+    template_version: str
+    prompt_max_tokens: int
 
 @router.get("/all_comedians", response_model=list[ComedianInfo])
 async def list_comedians(
     current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
 ):
     """
-    Return list of available comedians with their display names.
+    Return list of available comedians with their display names and prompt budgets.
     """
     comedians_list = []
     for enum_key, comedian_cls in MetaComedian.comedians.items():
@@ -126,6 +427,9 @@ async def list_comedians(
             ComedianInfo(
                 name=enum_key,
                 name_comedian=comedian_cls.name_comedian,
+                template_tokens=comedian_cls.template.tokens,
+                template_version=comedian_cls.template.version,
+                prompt_max_tokens=openai_settings.OPENAI_PROMPT_MAX_TOKENS,
             )
         )
     return comedians_list
@@ -141,32 +445,162 @@ class GetStoryHistoryModel(BaseModel):
     title: str
     story: str
 
+class StorySummaryModel(BaseModel):
+    """
+    Story summary model, without prompt nor story text.
+    """
+    id: UUID
+    title: str
+    comedian: ComedianStrEnum
+    date_created: str
+
+class StoryHistoryPageModel(BaseModel):
+    """
+    Story history page model. `next_cursor` is null on the last page.
+    """
+    items: list[StorySummaryModel]
+    next_cursor: str | None
+
+def encode_history_cursor(date_created: datetime, story_id: UUID) -> str:
+    return urlsafe_b64encode(f"{date_created.isoformat()}|{story_id}".encode("utf-8")).decode("utf-8")
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        date_created, story_id = urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8").split("|")
+        return datetime.fromisoformat(date_created), UUID(story_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from e
+
 @router.get("/history", response_model=list[GetStoryHistoryModel])
 async def get_story_history(
     current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
 ):
     """
-    Get story history.
+    Get story history, newest first. Loads the whole history with the full stories,
+    `/history/page` pages through summaries instead.
     """
     async with get_db_session() as session:
         result = await session.execute(
             select(UserPromptsTable)
             .where(UserPromptsTable.user_id == current_user.id)
-            .order_by(UserPromptsTable.date_created.desc())
+            .order_by(UserPromptsTable.date_created.desc(), UserPromptsTable.id.desc())
         )
         stories = result.scalars().all()
-        return [
-            GetStoryHistoryModel(
-                id=story.id,
-                prompt=story.prompt,
-                comedian=story.comedian,
-                date_created=story.date_created.isoformat(),
-                title=story.title,
-                story=story.story,
+
+    return [
+        GetStoryHistoryModel(
+            id=story.id,
+            prompt=story.prompt,
+            comedian=story.comedian,
+            date_created=story.date_created.isoformat(),
+            title=story.title,
+            story=story.story,
+        )
+        for story in stories
+    ]
+
+@router.get("/history/page", response_model=StoryHistoryPageModel)
+async def get_story_history_page(
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+):
+    """
+    Get story history, newest first, paginated by cursor.
+    """
+    query = (
+        select(
+            UserPromptsTable.id,
+            UserPromptsTable.title,
+            UserPromptsTable.comedian,
+            UserPromptsTable.date_created,
+        )
+        .where(UserPromptsTable.user_id == current_user.id)
+        .order_by(UserPromptsTable.date_created.desc(), UserPromptsTable.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(
+            tuple_(UserPromptsTable.date_created, UserPromptsTable.id)
+            < tuple_(*decode_history_cursor(cursor))
+        )
+
+    async with get_db_session() as session:
+        rows = (await session.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1].date_created, rows[-1].id)
+
+    return StoryHistoryPageModel(
+        items=[
+            StorySummaryModel(
+                id=row.id,
+                title=row.title,
+                comedian=row.comedian,
+                date_created=row.date_created.isoformat(),
             )
-            for story in stories
-        ]
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
     
+@router.get("/export", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def export_stories(
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+    gzip: bool = False,
+):
+    """
+    Export the whole story history as NDJSON (one story per line), newest first.
+
+    Rows are read through a server-side cursor and written as they arrive, so memory
+    stays constant whatever the size of the history.
+    """
+    query = (
+        select(UserPromptsTable)
+        .where(UserPromptsTable.user_id == current_user.id)
+        .order_by(UserPromptsTable.date_created.desc(), UserPromptsTable.id.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async def lines() -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(wbits=31) if gzip else None  # 31: gzip container
+
+        async with get_db_session() as session:
+            stories = await session.stream_scalars(query)
+            async for partition in stories.partitions():
+                chunk = "".join(
+                    GetStoryHistoryModel(
+                        id=story.id,
+                        prompt=story.prompt,
+                        comedian=story.comedian,
+                        date_created=story.date_created.isoformat(),
+                        title=story.title,
+                        story=story.story,
+                    ).model_dump_json() + "\n"
+                    for story in partition
+                ).encode("utf-8")
+                session.expunge_all()
+
+                if compressor is None:
+                    yield chunk
+                elif compressed := compressor.compress(chunk):
+                    yield compressed
+
+        if compressor is not None:
+            yield compressor.flush()
+
+    filename = "stories.ndjson.gz" if gzip else "stories.ndjson"
+    return StreamingResponse(
+        lines(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.delete("/delete/{story_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_story(
     story_id: UUID,
@@ -175,6 +609,29 @@ async def delete_story(
     """
     Delete a story.
     """
+    async with get_db_session() as session:
+        result = await session.execute(
+            delete(UserPromptsTable)
+            .where(UserPromptsTable.id == story_id, UserPromptsTable.user_id == current_user.id)
+            .returning(UserPromptsTable.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Story not found",
+            )
+        await session.commit()
+        return {"detail": "Story deleted successfully"}
+
+# Keep last: "/{story_id}" would shadow any single segment GET route declared after it
+@router.get("/{story_id}", response_model=GetStoryHistoryModel)
+async def get_story(
+    story_id: UUID,
+    current_user: Annotated[AuthenticatedUser, Depends(get_authenticated_user)],
+):
+    """
+    Get a story.
+    """
     async with get_db_session() as session:
         result = await session.execute(
             select(UserPromptsTable)
@@ -186,7 +643,11 @@ async def delete_story(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Story not found",
             )
-        await session.delete(story)
-        await session.commit()
-        return {"detail": "Story deleted successfully"}
-    
+        return GetStoryHistoryModel(
+            id=story.id,
+            prompt=story.prompt,
+            comedian=story.comedian,
+            date_created=story.date_created.isoformat(),
+            title=story.title,
+            story=story.story,
+        )
@@ -1,15 +1,16 @@
 from uuid import UUID
-from typing import Annotated
+from typing import Annotated, Any
 
-import bcrypt
 from fastapi import APIRouter, Depends, status, HTTPException
 from pydantic import BaseModel, StringConstraints, Field
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 
 from backend.database.functions import get_db_session
 from backend.database.tables import UsersTable, SessionsTable
 from backend.api.security import get_authenticated_user, AuthenticatedUser
 from backend.api.router_manager import RouterManager
+from backend.api.passwords import password_hasher
 from backend.api.security import SessionMiddleware
 
 router = RouterManager.add_router(APIRouter(prefix="/user_profile", tags=["user_profile"]))
@@ -60,40 +61,36 @@ async def update_user_profile(
     """
     Update user profile.
     """
-    async with get_db_session() as session:
-        result = await session.execute(
-            select(UsersTable)
-            .where(
-                UsersTable.id != current_user.id,
-                (UsersTable.username == form.username) | (UsersTable.email == form.email),
+    values: dict[str, Any] = {"username": form.username, "email": form.email}
+    if form.password:
+        values["password"] = await password_hasher.hash(form.password)
+
+    try:
+        async with get_db_session() as session:
+            result = await session.execute(
+                update(UsersTable)
+                .where(UsersTable.id == current_user.id)
+                .values(**values)
+                .returning(UsersTable.id, UsersTable.username, UsersTable.email)
+                .execution_options(synchronize_session=False)
             )
-            .limit(1)
+            db_user = result.one_or_none()
+            await session.commit()
+
+    except IntegrityError:
+        # Username or email taken by another user (unique constraints)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already exists",
         )
-        existing_user = result.scalars().first()
-
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username or email already exists",
-            )
-        
-        result = await session.execute(select(UsersTable).where(UsersTable.id == current_user.id))
-        db_user = result.scalars().first()
-
-        if not db_user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
-            )
-        db_user.username = form.username
-        db_user.email = form.email
 
-        if form.password:
-            new_password = bcrypt.hashpw(form.password.encode("utf-8"), bcrypt.gensalt())
-            db_user.password = new_password
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
+        )
 
-        await session.commit()
-        await session.refresh(db_user)
-        return GetUserProfileModel(id=db_user.id, username=db_user.username, email=db_user.email)
+    SessionMiddleware.invalidate_user(current_user.id)
+    return GetUserProfileModel(id=db_user.id, username=db_user.username, email=db_user.email)
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_profile(
@@ -112,4 +109,6 @@ async def delete_user_profile(
             )
         await session.delete(db_user)
         await session.commit()
-        return SessionMiddleware.logout(current_user)
\ No newline at end of file
+
+    SessionMiddleware.invalidate_user(current_user.id)
+    return await SessionMiddleware.logout(current_user)
\ No newline at end of file
@@ -1,28 +1,41 @@
+import logging
 import secrets
 from uuid import UUID
 from typing import Annotated, Any, TypedDict, Literal
 from base64 import urlsafe_b64encode
 
-import bcrypt
-
 from fastapi import Security, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.security import APIKeyCookie
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi.security import APIKeyCookie, HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 from jose.exceptions import JWTError
 from dataclasses import dataclass
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from fastapi import Request, Response
 from datetime import datetime, timedelta, UTC
+from time import perf_counter
 
 from backend.database.functions import get_db_session
 from backend.database.tables import SessionsTable
 from backend.database.tables import UsersTable
 from backend.settings.web import WebSettings
+from backend.extra.ttl_cache import TTLCache
+from backend.api.passwords import password_hasher
+from backend.api.metrics import SESSION_MIDDLEWARE_DURATION
 
 session_cookie_scheme = APIKeyCookie(name="session", auto_error=False)
 profile_cookie_scheme = APIKeyCookie(name="profile", auto_error=False)
+monitoring_token_scheme = HTTPBearer(auto_error=False)
 web_settings: WebSettings = WebSettings()  # type: ignore
+logger = logging.getLogger(__name__)
+
+# (user_id, session) -> whether the session exists in the database and hasn't expired
+session_cache: TTLCache[tuple[UUID, str], bool] = TTLCache(
+    maxsize=web_settings.WEB_SESSION_CACHE_SIZE,
+    ttl=web_settings.WEB_SESSION_CACHE_TTL_SECONDS,
+)
 
 
 @dataclass
@@ -55,89 +68,196 @@ class SetCookieTypedDict(TypedDict):
     domain: str
 
 async def get_authenticated_user(
+    request: Request,
     session: Annotated[str | None, Security(session_cookie_scheme)],
     profile: Annotated[str | None, Security(profile_cookie_scheme)],
 ) -> AuthenticatedUser:
-    if session is None or profile is None:
+    # Claims were verified once by SessionMiddleware
+    session_claims: dict[str, Any] | None = getattr(request.state, "session_claims", None)
+    profile_claims: dict[str, Any] | None = getattr(request.state, "profile_claims", None)
+
+    if session is None or profile is None or session_claims is None or profile_claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
 
-    return await SessionMiddleware.validate(session, profile)
+    return await SessionMiddleware.validate(session_claims, profile_claims)
 
 
-class SessionMiddleware(BaseHTTPMiddleware):
+async def require_monitoring_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(monitoring_token_scheme)],
+) -> None:
+    """
+    Guard of the internal endpoints: they don't exist unless `WEB_MONITORING_TOKEN` is
+    set, and require it as a bearer token.
+    """
+    token = web_settings.WEB_MONITORING_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
 
-    async def dispatch(self, request: Request, call_next):
-        cookies: list[SetCookieTypedDict] = []
-        
-        # Retrieving Cookies
-        session_cookie_encoded = request.cookies.get(session_cookie_scheme.scheme_name)
-        profile_cookie_encoded = request.cookies.get(profile_cookie_scheme.scheme_name)
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode("utf-8"), token.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-        if any([session_cookie_encoded, profile_cookie_encoded]) and not all(
-            [session_cookie_encoded, profile_cookie_encoded]
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid credentials",
-            )
 
+class SessionMiddleware:
+    """
+    Pure ASGI middleware verifying the session/profile cookies.
+
+    Verified claims are stored in the request state for `get_authenticated_user`, and
+    renewed cookies are added to the response start message only when `extend_cookie`
+    renews a token. Response bodies (including streams) are passed through untouched.
+    """
+
+    SESSION_CLAIMS = ("exp", "session", "user_id")
+    PROFILE_CLAIMS = ("exp", "user_id", "username", "email")
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        state = scope.setdefault("state", {})
+        state["session_claims"] = None
+        state["profile_claims"] = None
+        set_cookie_headers: list[str] = []
+
+        # Retrieving Cookies
+        cookies = self.read_cookies(scope)
+        session_cookie_encoded = cookies.get(session_cookie_scheme.model.name)
+        profile_cookie_encoded = cookies.get(profile_cookie_scheme.model.name)
+
+        # Requests with a missing or invalid cookie are left unauthenticated:
+        # get_authenticated_user rejects them with a 401.
         if session_cookie_encoded and profile_cookie_encoded:
-            session_decoded = jwt.decode(
-                session_cookie_encoded,
-                web_settings.WEB_COOKIE_SECRET,
-                algorithms=["HS256"],
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "require": ["exp", "session", "user_id"],
-                },
-            )
-            
-            session_cookie_extended = self.extend_cookie(session_decoded)
-            if session_cookie_extended is not None:
-                session_cookie = self.create_session_cookie(session_cookie_extended)
-                cookies.append(session_cookie)
-            
-            profile_decoded = jwt.decode(
-                profile_cookie_encoded,
-                web_settings.WEB_COOKIE_SECRET,
-                algorithms=["HS256"],
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "require": ["exp", "user_id", "username", "email"],
-                },
-            )
-            
-            profile_cookie_extended = self.extend_cookie(profile_decoded)
-            if profile_cookie_extended:
-                profile_cookie = self.create_profile_cookie(profile_cookie_extended)
-                cookies.append(profile_cookie)
-            
-        response: Response = await call_next(request)
-        for cookie in cookies:
-            response.set_cookie(**cookie)
+            try:
+                session_decoded = self.decode_cookie(session_cookie_encoded, self.SESSION_CLAIMS)
+                profile_decoded = self.decode_cookie(profile_cookie_encoded, self.PROFILE_CLAIMS)
+            except JWTError:
+                session_decoded = profile_decoded = None
+
+            if session_decoded is not None and profile_decoded is not None:
+                state["session_claims"] = session_decoded
+                state["profile_claims"] = profile_decoded
+
+                now = datetime.now(UTC)
+
+                session_cookie_extended = self.extend_cookie(session_decoded, now)
+                if session_cookie_extended is not None and await self.extend_session(
+                    session_decoded, session_cookie_extended["exp"]
+                ):
+                    set_cookie_headers.append(
+                        self.render_cookie(self.create_session_cookie(session_cookie_extended))
+                    )
 
-        return response
+                profile_cookie_extended = self.extend_cookie(profile_decoded, now)
+                if profile_cookie_extended is not None:
+                    set_cookie_headers.append(
+                        self.render_cookie(self.create_profile_cookie(profile_cookie_extended))
+                    )
+
+        SESSION_MIDDLEWARE_DURATION.observe(perf_counter() - start)
+
+        if not set_cookie_headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookies(message: Message) -> None:
+            # Rejected requests get their cookies deleted, don't renew them
+            if message["type"] == "http.response.start" and message["status"] != 401:
+                headers = MutableHeaders(scope=message)
+                for header in set_cookie_headers:
+                    headers.append("set-cookie", header)
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
 
     @staticmethod
-    def extend_cookie(claims: dict[str, Any]) -> dict[str, Any] | None:
-        now = datetime.now(UTC)
+    def read_cookies(scope: Scope) -> dict[str, str]:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                return cookie_parser(value.decode("latin-1"))
+
+        return {}
+
+    @staticmethod
+    def render_cookie(cookie: SetCookieTypedDict) -> str:
+        response = Response()
+        response.set_cookie(**cookie)
+        return response.headers["set-cookie"]
+
+    @staticmethod
+    def decode_cookie(token: str, required_claims: tuple[str, ...]) -> dict[str, Any]:
+        """
+        Verify the signature and expiration of a cookie JWT and return its claims.
+        """
+        claims = jwt.decode(
+            token,
+            web_settings.WEB_COOKIE_SECRET,
+            algorithms=["HS256"],
+            options={
+                "verify_signature": True,
+                "verify_exp": True,
+            },
+        )
+
+        missing = [claim for claim in required_claims if claim not in claims]
+        if missing:
+            raise JWTError(f"Missing claims: {', '.join(missing)}")
+
+        return claims
+
+    @staticmethod
+    def extend_cookie(claims: dict[str, Any], now: datetime | None = None) -> dict[str, Any] | None:
+        now = now or datetime.now(UTC)
 
         exp: int = claims["exp"]
         extend_trigger = web_settings.WEB_COOKIE_EXTEND_TRIGGER_SECONDS
         exp_diff = exp - int(now.timestamp())
 
         if exp_diff <= extend_trigger:
-            claims["exp"] = int((now + timedelta(seconds=web_settings.WEB_COOKIE_EXPIRATION_SECONDS)).timestamp())
-            claims["nonce"] = secrets.token_urlsafe(16)
-            return claims
+            return {
+                **claims,
+                "exp": int((now + timedelta(seconds=web_settings.WEB_COOKIE_EXPIRATION_SECONDS)).timestamp()),
+            }
 
         return None
 
+    @staticmethod
+    async def extend_session(claims: dict[str, Any], exp: int) -> bool:
+        """
+        Move the stored expiration of a session along with its cookie. Returns False if
+        the session is gone or expired, in which case the cookie must not be renewed.
+        """
+        try:
+            async with get_db_session() as db_session:
+                result = await db_session.execute(
+                    update(SessionsTable)
+                    .where(
+                        SessionsTable.user_id == UUID(claims["user_id"]),
+                        SessionsTable.session == claims["session"],
+                        SessionsTable.expires > func.now(),
+                    )
+                    .values(expires=datetime.fromtimestamp(exp, UTC))
+                )
+                await db_session.commit()
+        except Exception:
+            logger.warning("Could not extend session", exc_info=True)
+            return False
+
+        return result.rowcount > 0
+
     @staticmethod
     def create_session_cookie(values: dict[str, Any]) -> SetCookieTypedDict:
         values.update(nonce=secrets.token_urlsafe(16))
@@ -174,30 +294,36 @@ class SessionMiddleware(BaseHTTPMiddleware):
             "domain": web_settings.WEB_FQDN,
         }
     
+    @staticmethod
+    def invalidate_session(user_id: UUID, session: str) -> None:
+        session_cache.pop((user_id, session))
+
+    @staticmethod
+    def invalidate_user(user_id: UUID) -> None:
+        session_cache.pop_where(lambda key: key[0] == user_id)
+
     @staticmethod
     async def logout(current_user: AuthenticatedUser) -> Response:
+        SessionMiddleware.invalidate_session(current_user.id, current_user.session)
+
         try:
             
             async with get_db_session() as db_session:
-                result = await db_session.execute(
-                    select(SessionsTable).where(
+                await db_session.execute(
+                    delete(SessionsTable).where(
                         SessionsTable.user_id == current_user.id,
                         SessionsTable.session == current_user.session,
                     )
                 )
-                
-                session = result.scalar_one_or_none()
-                if session is not None:
-                    await db_session.delete(session)
-                    await db_session.commit()
+                await db_session.commit()
                     
         except Exception as e:
             pass # Handle exception if needed. For example, log it.
         
         finally:
             response = Response(status_code=status.HTTP_204_NO_CONTENT, content='')
-            response.delete_cookie(session_cookie_scheme.scheme_name)
-            response.delete_cookie(profile_cookie_scheme.scheme_name)
+            response.delete_cookie(session_cookie_scheme.model.name)
+            response.delete_cookie(profile_cookie_scheme.model.name)
             return response
     
     @staticmethod
@@ -206,53 +332,69 @@ class SessionMiddleware(BaseHTTPMiddleware):
         username: str,
         password: str,
     ) -> Response:
-        now = datetime.now(UTC)
-        expires = now + timedelta(seconds=web_settings.WEB_COOKIE_EXPIRATION_SECONDS)
-        
+        # Password hashing takes a while, never hold a pooled connection during it
         async with get_db_session() as db_session:
             result = await db_session.execute(
-                select(UsersTable).where(UsersTable.username == username)
+                select(
+                    UsersTable.id,
+                    UsersTable.username,
+                    UsersTable.email,
+                    UsersTable.password,
+                ).where(UsersTable.username == username)
             )
-            
-            user = result.scalar_one_or_none()
-            
-            if user is None or not bcrypt.checkpw(password.encode("utf-8"), user.password):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid credentials",
-                )
+            user = result.one_or_none()
 
-            session = urlsafe_b64encode(secrets.token_bytes(32)).decode("utf-8")
-            
-            user_agent = request.headers.get("User-Agent")
-            ip_address = request.client.host if request.client else None
-            
-            session_record = SessionsTable(
-                session=session,
-                user_id=user.id,
-                user_agent=user_agent,
-                ip_address=ip_address,
-                expires=expires,
+        if user is None or not await password_hasher.check(password, user.password):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid credentials",
             )
-            
-            db_session.add(session_record)
-            
-        
-            session = {
-                "user_id": str(user.id),
-                "session": session,
-                "exp": int(expires.timestamp()),
-            }
-            
-            profile = {
-                "user_id": str(user.id),
-                "username": str(user.username),
-                "email": str(user.email),
-                "exp": int(expires.timestamp()),
-            }
+
+        # Transparently upgrade hashes created with another cost factor
+        rehashed_password = None
+        if password_hasher.needs_rehash(user.password):
+            rehashed_password = await password_hasher.hash(password)
+
+        now = datetime.now(UTC)
+        expires = now + timedelta(seconds=web_settings.WEB_COOKIE_EXPIRATION_SECONDS)
+        session = urlsafe_b64encode(secrets.token_bytes(32)).decode("utf-8")
+
+        user_agent = request.headers.get("User-Agent")
+        ip_address = request.client.host if request.client else None
+
+        async with get_db_session() as db_session:
+            db_session.add(
+                SessionsTable(
+                    session=session,
+                    user_id=user.id,
+                    user_agent=user_agent,
+                    ip_address=ip_address,
+                    expires=expires,
+                )
+            )
+
+            if rehashed_password is not None:
+                await db_session.execute(
+                    update(UsersTable)
+                    .where(UsersTable.id == user.id)
+                    .values(password=rehashed_password)
+                )
 
             await db_session.commit()
-            
+
+        session = {
+            "user_id": str(user.id),
+            "session": session,
+            "exp": int(expires.timestamp()),
+        }
+
+        profile = {
+            "user_id": str(user.id),
+            "username": str(user.username),
+            "email": str(user.email),
+            "exp": int(expires.timestamp()),
+        }
+
         create_session_cookie = SessionMiddleware.create_session_cookie(session)
         create_profile_cookie = SessionMiddleware.create_profile_cookie(profile)
         
@@ -264,48 +406,69 @@ class SessionMiddleware(BaseHTTPMiddleware):
         
     @staticmethod
     async def validate(
-        session: str,
-        profile: str,
+        session_claims: dict[str, Any],
+        profile_claims: dict[str, Any],
     ) -> AuthenticatedUser:
 
         try:
-            session_raw = jwt.get_unverified_claims(session)
-            profile_raw = jwt.get_unverified_claims(profile)
-
             session_data = SessionData(
-                user_id=UUID(session_raw["user_id"]),
-                session=session_raw["session"],
+                user_id=UUID(session_claims["user_id"]),
+                session=session_claims["session"],
             )
 
             profile_data = ProfileData(
-                user_id=UUID(profile_raw["user_id"]),
-                username=profile_raw["username"],
-                email=profile_raw["email"],
+                user_id=UUID(profile_claims["user_id"]),
+                username=profile_claims["username"],
+                email=profile_claims["email"],
+            )
+
+        except (KeyError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid credentials",
+            ) from e
+
+        if session_data.user_id != profile_data.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid credentials",
             )
 
+        cache_key = (session_data.user_id, session_data.session)
+        is_valid = session_cache.get(cache_key)
+
+        if is_valid is None:
             async with get_db_session() as db_session:
                 result = await db_session.execute(
-                    select(SessionsTable).where(
+                    select(func.extract("epoch", SessionsTable.expires - func.now())).where(
                         SessionsTable.user_id == session_data.user_id,
                         SessionsTable.session == session_data.session,
+                        SessionsTable.expires > func.now(),
                     )
                 )
-                
-                if result.one_or_none() is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Invalid credentials",
-                    )
-
-            return AuthenticatedUser(
-                id=session_data.user_id,
-                username=profile_data.username,
-                email=profile_data.email,
-                session=session_data.session,
+                expires_in = result.scalar_one_or_none()
+                is_valid = expires_in is not None
+
+            # Never cache a session past its expiry
+            session_cache.set(
+                cache_key,
+                is_valid,
+                ttl=(
+                    min(session_cache.ttl, float(expires_in))
+                    if is_valid
+                    else web_settings.WEB_SESSION_CACHE_NEGATIVE_TTL_SECONDS
+                ),
             )
 
-        except JWTError as e:
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials",
-            ) from e
+            )
+
+        return AuthenticatedUser(
+            id=session_data.user_id,
+            username=profile_data.username,
+            email=profile_data.email,
+            session=session_data.session,
+        )
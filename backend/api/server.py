@@ -0,0 +1,84 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+"""
+
+import os
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from backend.settings.web import WebSettings
+
+web_settings: WebSettings = WebSettings()  # type: ignore
+
+
+class SornaUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker on uvloop and httptools. The lifespan is required: a worker that fails
+    to start the engine or the LLM client exits instead of serving errors.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+    }
+
+
+class SornaApplication(BaseApplication):
+    """
+    Gunicorn application serving `backend.api:app` with the given gunicorn settings.
+    """
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from backend.api import app
+
+        return app
+
+
+def get_default_workers() -> int:
+    """
+    One async worker per CPU available to the process (affinity and cgroup cpusets
+    included when the platform reports them).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_server_options(
+    host: str | None = None,
+    port: int | None = None,
+    workers: int | None = None,
+    reload: bool = False,
+) -> dict[str, Any]:
+    """
+    Gunicorn settings from `WebSettings`, overridden by the given values.
+    """
+    workers = workers or web_settings.WEB_WORKERS or get_default_workers()
+
+    return {
+        "bind": f"{host or web_settings.WEB_HOST}:{port or web_settings.WEB_PORT}",
+        "workers": workers,
+        "worker_class": f"{SornaUvicornWorker.__module__}.{SornaUvicornWorker.__qualname__}",
+        # Code reloading re-imports the app in every worker, incompatible with preloading
+        "preload_app": web_settings.WEB_PRELOAD and not reload,
+        "reload": reload,
+        "max_requests": web_settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": web_settings.WEB_MAX_REQUESTS_JITTER,
+        "keepalive": web_settings.WEB_KEEPALIVE_SECONDS,
+        "timeout": web_settings.WEB_TIMEOUT_SECONDS,
+        "graceful_timeout": web_settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+        "backlog": web_settings.WEB_BACKLOG,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
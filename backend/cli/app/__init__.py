@@ -1,9 +1,17 @@
 import click
 
+from .batch import cmd_batch_generate
+from .llm_stub import cmd_llm_stub
+from .serve import cmd_serve
+from .worker import cmd_worker
+
 group_app = click.Group(
     name="app",
     help="Commands to manage the application.",
     commands=[
-        
+        cmd_batch_generate,
+        cmd_llm_stub,
+        cmd_serve,
+        cmd_worker,
     ],
-)
\ No newline at end of file
+)
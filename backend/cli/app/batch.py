@@ -0,0 +1,92 @@
+import click
+
+from backend.database.enums.comedians import ComedianStrEnum
+
+
+@click.command("batch-generate")
+@click.option("--prompt", default=None, help="Prompt of every story. Required unless resuming with --batch-id.")
+@click.option(
+    "--comedian",
+    "comedians",
+    multiple=True,
+    type=click.Choice([comedian.value for comedian in ComedianStrEnum]),
+    help="Comedians to generate for, repeatable. Defaults to all of them.",
+)
+@click.option("--user", "users", multiple=True, type=click.UUID, help="Users to generate for, repeatable. Defaults to all of them.")
+@click.option("--batch-id", default=None, help="Resume waiting for and loading an already submitted batch.")
+@click.option("--poll-interval", default=30.0, show_default=True, type=float, help="Seconds between status checks.")
+@click.option("--dry-run", is_flag=True, help="Print the batch input file instead of submitting it.")
+def cmd_batch_generate(
+    prompt: str | None,
+    comedians: tuple[str, ...],
+    users: tuple,
+    batch_id: str | None,
+    poll_interval: float,
+    dry_run: bool,
+):
+    """
+    Generate stories offline through the provider Batch API, one per user and comedian.
+    """
+    import asyncio
+    import logging
+
+    import backend.comedians  # Register the comedians
+    from backend.comedians.base import MetaComedian
+    from backend.database.functions import dispose_engine
+    from backend.jobs.batch import (
+        BATCH_MAX_REQUESTS,
+        build_batch_file,
+        copy_stories,
+        get_user_ids,
+        read_batch_results,
+        submit_batch,
+        wait_for_batch,
+    )
+    from backend.llm.client import LLMClient
+
+    if not batch_id and not prompt:
+        raise click.UsageError("--prompt is required unless --batch-id is given.")
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> None:
+        client = LLMClient()
+        try:
+            nonlocal batch_id
+            if not batch_id:
+                selected = [
+                    MetaComedian.get_comedian(ComedianStrEnum(name))
+                    for name in comedians or [comedian.value for comedian in ComedianStrEnum]
+                ]
+                user_ids = await get_user_ids(users)
+                requests = len(user_ids) * len(selected)
+                if not requests:
+                    click.echo("No users to generate stories for.")
+                    return
+                if requests > BATCH_MAX_REQUESTS:
+                    raise click.ClickException(
+                        f"{requests} requests exceed the batch limit of {BATCH_MAX_REQUESTS}, select fewer users."
+                    )
+
+                content = build_batch_file(user_ids, selected, prompt or "")
+                if dry_run:
+                    click.echo(content.decode("utf-8"))
+                    return
+
+                batch = await submit_batch(client, content, metadata={"source": "sorna batch-generate"})
+                batch_id = batch.id
+                click.echo(f"Submitted batch {batch_id} with {requests} requests.")
+
+            batch = await wait_for_batch(client, batch_id, poll_interval)
+            if batch.status != "completed":
+                raise click.ClickException(f"Batch {batch_id} ended as {batch.status}.")
+
+            results = await read_batch_results(client, batch)
+            await copy_stories(results.records)
+            click.echo(f"Loaded {len(results.records)} stories, {results.failed} requests failed.")
+
+        finally:
+            await client.close()
+            await dispose_engine()
+
+    asyncio.run(run())
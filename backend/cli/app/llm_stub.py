@@ -0,0 +1,47 @@
+import click
+
+@click.command("llm-stub")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8090, show_default=True, type=int)
+@click.option("--latency", default=0.5, show_default=True, type=float, help="Seconds before the first byte.")
+@click.option("--chunk-delay", default=0.01, show_default=True, type=float, help="Seconds between streamed chunks.")
+@click.option("--failure-rate", default=0.0, show_default=True, type=click.FloatRange(0, 1), help="Share of calls answered with an error.")
+@click.option("--failure-status", default=500, show_default=True, type=int, help="Status code of failed calls.")
+@click.option("--slow-rate", default=0.0, show_default=True, type=click.FloatRange(0, 1), help="Share of calls answered after --slow-latency.")
+@click.option("--slow-latency", default=30.0, show_default=True, type=float, help="Seconds before the first byte of slow calls.")
+@click.option("--malformed-rate", default=0.0, show_default=True, type=click.FloatRange(0, 1), help="Share of calls returning fenced, truncated JSON.")
+@click.option("--stream-cut-rate", default=0.0, show_default=True, type=click.FloatRange(0, 1), help="Share of streams cut after their first chunk.")
+@click.option("--seed", default=None, type=int, help="Seed for reproducible fault injection.")
+def cmd_llm_stub(
+    host: str,
+    port: int,
+    latency: float,
+    chunk_delay: float,
+    failure_rate: float,
+    failure_status: int,
+    slow_rate: float,
+    slow_latency: float,
+    malformed_rate: float,
+    stream_cut_rate: float,
+    seed: int | None,
+):
+    """
+    Serve a local stub of the OpenAI chat completions API, optionally injecting faults.
+    """
+    import uvicorn
+
+    from backend.llm.stub import StubFaultsModel, create_stub_app
+
+    faults = StubFaultsModel(
+        failure_rate=failure_rate,
+        failure_status=failure_status,
+        slow_rate=slow_rate,
+        slow_latency=slow_latency,
+        malformed_rate=malformed_rate,
+        stream_cut_rate=stream_cut_rate,
+    )
+    uvicorn.run(
+        create_stub_app(latency=latency, chunk_delay=chunk_delay, faults=faults, seed=seed),
+        host=host,
+        port=port,
+    )
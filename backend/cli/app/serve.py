@@ -0,0 +1,17 @@
+import click
+
+@click.command("serve")
+@click.option("--host", default=None, help="Defaults to WEB_HOST.")
+@click.option("--port", default=None, type=int, help="Defaults to WEB_PORT.")
+@click.option("--workers", default=None, type=int, help="Defaults to WEB_WORKERS, or one per CPU.")
+@click.option("--reload", is_flag=True, help="Restart workers on code changes (development, disables preloading).")
+def cmd_serve(host: str | None, port: int | None, workers: int | None, reload: bool):
+    """
+    Serve the API with gunicorn and uvicorn workers.
+
+    Send SIGHUP to the master to replace the workers gracefully (with preloading, code
+    changes need a full restart) and SIGTERM to shut down.
+    """
+    from backend.api.server import SornaApplication, get_server_options
+
+    SornaApplication(get_server_options(host, port, workers, reload)).run()
@@ -0,0 +1,22 @@
+import click
+
+@click.command("worker")
+@click.option(
+    "--concurrency",
+    type=int,
+    default=None,
+    help="Jobs processed at once. Defaults to JOBS_CONCURRENCY.",
+)
+def cmd_worker(concurrency: int | None):
+    """
+    Process queued story generation jobs.
+    """
+    import asyncio
+    import logging
+
+    from backend.jobs.worker import run_worker
+
+    logging.basicConfig(level=logging.INFO)
+    click.echo("Worker started, press Ctrl+C to stop.")
+    asyncio.run(run_worker(concurrency))
+    click.echo("Worker stopped.")
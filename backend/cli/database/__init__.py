@@ -2,5 +2,6 @@ import click
 
 from .drop import cmd_drop
 from .create import cmd_create
+from .reap_sessions import cmd_reap_sessions
 
-group_database = click.Group("database", commands=[cmd_drop, cmd_create])
\ No newline at end of file
+group_database = click.Group("database", commands=[cmd_drop, cmd_create, cmd_reap_sessions])
\ No newline at end of file
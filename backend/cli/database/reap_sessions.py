@@ -0,0 +1,32 @@
+import click
+
+@click.command("reap-sessions")
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Rows deleted per statement. Defaults to WEB_SESSION_REAPER_BATCH_SIZE.",
+)
+def cmd_reap_sessions(batch_size: int | None):
+    """
+    Delete expired sessions.
+    """
+    import asyncio
+
+    from backend.database.functions import dispose_engine
+    from backend.database.sessions import reap_expired_sessions
+    from backend.settings.web import WebSettings
+
+    async def run() -> int:
+        try:
+            return await reap_expired_sessions(batch_size or WebSettings().WEB_SESSION_REAPER_BATCH_SIZE)
+        finally:
+            await dispose_engine()
+
+    try:
+        deleted = asyncio.run(run())
+    except Exception as e:
+        click.echo(f"Error reaping sessions: {e}")
+        return
+
+    click.echo(f"Deleted {deleted} expired sessions.")
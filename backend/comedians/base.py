@@ -1,5 +1,6 @@
 from typing import Any
 from backend.database.enums.comedians import ComedianStrEnum
+from .template import ComedianTemplate, build_comedian_template
 
 class MetaComedian(type):
     comedians: dict[ComedianStrEnum, type["BaseComedian"]] = {}
@@ -24,6 +25,10 @@ class MetaComedian(type):
             
         super(MetaComedian, cls).__init__(name, bases, attrs)
 
+        if bases:
+            # Built once at import time, requests only append the user prompt
+            cls.template = build_comedian_template(cls.get_context()) # type: ignore
+
     @classmethod
     def get_comedian(cls, name: ComedianStrEnum) -> type["BaseComedian"]:
         if name not in cls.comedians:
@@ -34,6 +39,7 @@ class MetaComedian(type):
 class BaseComedian(metaclass=MetaComedian):
     name: ComedianStrEnum
     name_comedian: str
+    template: ComedianTemplate
 
     @staticmethod
     def get_context() -> str: ...
\ No newline at end of file
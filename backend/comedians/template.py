@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from functools import cached_property
+from hashlib import blake2b
+
+from backend.llm.tokens import count_tokens
+
+__all__ = ["ComedianTemplate", "SYSTEM_PROMPT", "FORMAT_PROMPT", "build_comedian_template"]
+
+SYSTEM_PROMPT = "Eres un asistente que responde solo en formato JSON válido."
+
+FORMAT_PROMPT = (
+    "Tu respuesta debe ser un objeto JSON válido con exactamente dos claves: "
+    "\"title\" y \"story\". Ambas claves deben estar presentes SIEMPRE. "
+    "\"title\" debe ser una cadena corta y descriptiva del contenido de la historia. "
+    "\"story\" debe ser una cadena que contenga la historia generada. "
+    "No incluyas ningún texto fuera del objeto JSON. No uses bloques de código. "
+    "Ejemplo de formato: {\"title\": \"El despertar\", \"story\": \"Un día, el sol no salió...\"}"
+)
+
+
+@dataclass(frozen=True)
+class ComedianTemplate:
+    """
+    Static part of the messages sent for a comedian: everything but the user prompt.
+
+    The persona goes in the system message so every request of a comedian shares the
+    same prefix, which the provider can serve from its prompt cache.
+    """
+
+    messages: tuple[tuple[str, str], ...]  # (role, content)
+    version: str
+
+    @cached_property
+    def tokens(self) -> int:
+        # Counted on first use, not when comedians are imported: the tokenizer encoding
+        # may have to be downloaded, which a preloading server master must not wait for
+        return sum(count_tokens(content) for _, content in self.messages)
+
+
+def build_comedian_template(persona: str) -> ComedianTemplate:
+    # Personas are indented triple-quoted strings, the indentation only costs tokens
+    persona = "\n".join(line.strip() for line in persona.strip().splitlines())
+    system = "\n\n".join((SYSTEM_PROMPT, FORMAT_PROMPT, persona))
+    messages = (("system", system),)
+
+    return ComedianTemplate(
+        messages=messages,
+        version=blake2b("\0".join(content for _, content in messages).encode("utf-8"), digest_size=8).hexdigest(),
+    )
@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+class JobStatusStrEnum(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -1,8 +1,32 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import os
 from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
 from backend.settings.database import DatabaseSettings
 
-__all__ = ["get_connection_string", "get_db_session", "get_engine"]
+from .metrics import DB_POOL_CHECKOUT_DURATION, instrument_engine
+
+__all__ = [
+    "get_connection_string",
+    "get_db_session",
+    "get_engine",
+    "get_sessionmaker",
+    "init_engine",
+    "dispose_engine",
+]
+
+# Process-wide engine and session factory. Each worker process owns its own pool, so the
+# total number of Postgres connections is workers * (pool size + max overflow).
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_engine_pid: int | None = None
 
 
 def get_connection_string(manage: bool = False):
@@ -16,29 +40,87 @@ def get_connection_string(manage: bool = False):
         settings.DATABASE_NAME if not manage else "postgres",
     )
 
-def get_engine(manage: bool = False):
-    return create_async_engine(get_connection_string(manage), echo=False, future=True,)
+
+def get_engine(manage: bool = False) -> AsyncEngine:
+    """
+    Return the shared pooled engine.
+
+    Management engines point to the maintenance database, are not pooled and must be
+    disposed by the caller.
+    """
+    if manage:
+        return create_async_engine(get_connection_string(manage), echo=False, poolclass=NullPool)
+
+    return init_engine()
+
+
+def init_engine() -> AsyncEngine:
+    """
+    Create the shared engine and session factory once per process.
+    """
+    global _engine, _sessionmaker, _engine_pid
+
+    if _engine is not None:
+        if _engine_pid != os.getpid():
+            # Inherited through fork (e.g. gunicorn --preload): leave the parent's
+            # connections alone and start a fresh pool in this process.
+            _engine.sync_engine.dispose(close=False)
+            _engine_pid = os.getpid()
+        return _engine
+
+    settings = DatabaseSettings()
+
+    _engine = create_async_engine(
+        get_connection_string(),
+        echo=False,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+    _sessionmaker = async_sessionmaker(autocommit=False, bind=_engine)
+    _engine_pid = os.getpid()
+    instrument_engine(_engine)
+
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    init_engine()
+    assert _sessionmaker is not None
+
+    return _sessionmaker
+
+
+async def dispose_engine() -> None:
+    """
+    Close every pooled connection. Called on application shutdown and at the end of
+    CLI commands that run their own event loop.
+    """
+    global _engine, _sessionmaker, _engine_pid
+
+    if _engine is None:
+        return
+
+    engine = _engine
+    _engine, _sessionmaker, _engine_pid = None, None, None
+    await engine.dispose()
 
 
 @asynccontextmanager
 async def get_db_session():
-    session = None
-    try:
-        engine = get_engine()
-        async_session = async_sessionmaker(autocommit=False, bind=engine)
-        session = async_session()
+    async with get_sessionmaker()() as session:
+        try:
+            # Check the connection out upfront to time the pool wait
+            with DB_POOL_CHECKOUT_DURATION.time():
+                await session.connection()
 
-        async with async_session() as session:
             yield session
-    
-    except:
-        if session is not None:
-            await session.rollback()
-        raise
 
-    finally:
-        if session is not None:
-            await session.close()
+        except:
+            await session.rollback()
+            raise
 
 
 async def drop_database():
@@ -48,9 +130,12 @@ async def drop_database():
     settings = DatabaseSettings()
 
     engine = get_engine(manage=True)
-    async with engine.connect() as conn:
-       await conn.execute(text(f"COMMIT;"))
-       await conn.execute(text(f"DROP DATABASE {settings.DATABASE_NAME} WITH (FORCE);"))
+    try:
+        async with engine.connect() as conn:
+           await conn.execute(text(f"COMMIT;"))
+           await conn.execute(text(f"DROP DATABASE {settings.DATABASE_NAME} WITH (FORCE);"))
+    finally:
+        await engine.dispose()
 
 
 async def create_database():
@@ -60,6 +145,9 @@ async def create_database():
     settings = DatabaseSettings()
     
     engine = get_engine(manage=True)
-    async with engine.connect() as conn:
-       await conn.execute(text(f"COMMIT;"))
-       await conn.execute(text(f"CREATE DATABASE {settings.DATABASE_NAME};"))
+    try:
+        async with engine.connect() as conn:
+           await conn.execute(text(f"COMMIT;"))
+           await conn.execute(text(f"CREATE DATABASE {settings.DATABASE_NAME};"))
+    finally:
+        await engine.dispose()
@@ -0,0 +1,38 @@
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.extra.metrics import Histogram
+
+__all__ = ["instrument_engine", "DB_QUERY_DURATION", "DB_POOL_CHECKOUT_DURATION"]
+
+DB_QUERY_DURATION = Histogram(
+    "sorna_db_query_duration_seconds",
+    "Database statement latency by statement type",
+    ("statement",),
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "sorna_db_pool_checkout_duration_seconds",
+    "Time to get a pooled connection, including the wait for a free one and the pre-ping",
+)
+
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY"}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    DB_QUERY_DURATION.labels(keyword if keyword in STATEMENT_TYPES else "OTHER").observe(perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
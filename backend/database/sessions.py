@@ -0,0 +1,57 @@
+import asyncio
+import logging
+
+from sqlalchemy import delete, func, select
+
+from .functions import get_db_session
+from .tables import SessionsTable
+
+__all__ = ["reap_expired_sessions", "run_session_reaper"]
+
+logger = logging.getLogger(__name__)
+
+
+async def reap_expired_sessions(batch_size: int) -> int:
+    """
+    Delete expired sessions, `batch_size` rows per statement and transaction so locks
+    and WAL stay bounded. Returns the number of deleted sessions.
+
+    `SKIP LOCKED` lets several reapers (one per worker) run at once without waiting on
+    each other.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    deleted = 0
+
+    while True:
+        expired = (
+            select(SessionsTable.session)
+            .where(SessionsTable.expires < func.now())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        async with get_db_session() as session:
+            result = await session.execute(
+                delete(SessionsTable).where(SessionsTable.session.in_(expired.scalar_subquery()))
+            )
+            await session.commit()
+
+        deleted += result.rowcount
+        if result.rowcount == 0 or result.rowcount < batch_size:
+            return deleted
+
+
+async def run_session_reaper(interval: float, batch_size: int) -> None:
+    """
+    Reap expired sessions every `interval` seconds until cancelled.
+    """
+    while True:
+        try:
+            if deleted := await reap_expired_sessions(batch_size):
+                logger.info("Reaped %s expired sessions", deleted)
+        except Exception:
+            logger.exception("Session reaper failed")
+
+        await asyncio.sleep(interval)
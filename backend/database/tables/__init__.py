@@ -1,3 +1,5 @@
 from .users import UsersTable
 from .sessions import SessionsTable
-from .user_prompts import UserPromptsTable
\ No newline at end of file
+from .user_prompts import UserPromptsTable
+from .story_jobs import StoryJobsTable
+from .generation_cache import GenerationCacheTable
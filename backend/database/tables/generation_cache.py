@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime
+from .base import Base
+
+class GenerationCacheTable(Base):
+    """
+    Generated stories cache model.
+    """
+
+    __tablename__ = "generation_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    title: Mapped[str] = mapped_column(nullable=False)
+    story: Mapped[str] = mapped_column(nullable=False)
+    date_created: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
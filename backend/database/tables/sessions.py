@@ -13,7 +13,7 @@ class SessionsTable(Base):
     __tablename__ = "sessions"
 
     session: Mapped[str] = mapped_column(String(44), primary_key=True)
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
-    expires: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    expires: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     user_agent: Mapped[str | None] = mapped_column(nullable=True)
     ip_address: Mapped[str | None] = mapped_column(nullable=True)
\ No newline at end of file
@@ -0,0 +1,39 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.enums.jobs import JobStatusStrEnum
+from .base import Base
+
+
+class StoryJobsTable(Base):
+    """
+    Story generation jobs model.
+    """
+
+    __tablename__ = "story_jobs"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    prompt: Mapped[str] = mapped_column(nullable=False)
+    comedian: Mapped[ComedianStrEnum] = mapped_column(Enum(ComedianStrEnum), nullable=False)
+    date_created: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    date_updated: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    use_cache: Mapped[bool] = mapped_column(nullable=False, default=True)
+    status: Mapped[JobStatusStrEnum] = mapped_column(
+        Enum(JobStatusStrEnum), nullable=False, default=JobStatusStrEnum.PENDING
+    )
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+    run_after: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+    error: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    story_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("user_prompts.id", ondelete="SET NULL"), nullable=True, default=None
+    )
+    id: Mapped[UUID] = mapped_column(Uuid(), primary_key=True, default_factory=uuid4)
+
+
+# Claiming the oldest pending job: WHERE status = ? ORDER BY date_created
+Index("ix_story_jobs_status_date_created", StoryJobsTable.status, StoryJobsTable.date_created)
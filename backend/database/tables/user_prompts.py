@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlalchemy import DateTime
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Uuid, ForeignKey, Enum
+from sqlalchemy import Uuid, ForeignKey, Enum, Index
 from backend.database.enums.comedians import ComedianStrEnum
 from .base import Base
 from .sessions import SessionsTable
@@ -22,4 +22,12 @@ class UserPromptsTable(Base):
     comedian: Mapped[ComedianStrEnum] = mapped_column(Enum(ComedianStrEnum), nullable=False)
     title: Mapped[str] = mapped_column(nullable=True)
     story: Mapped[str] = mapped_column(nullable=True)
-    id: Mapped[UUID] = mapped_column(Uuid(), primary_key=True, default_factory=uuid4)
\ No newline at end of file
+    id: Mapped[UUID] = mapped_column(Uuid(), primary_key=True, default_factory=uuid4)
+
+# Keyset pagination of a user's history: WHERE user_id = ? ORDER BY date_created DESC, id DESC
+Index(
+    "ix_user_prompts_user_id_date_created_id",
+    UserPromptsTable.user_id,
+    UserPromptsTable.date_created.desc(),
+    UserPromptsTable.id.desc(),
+)
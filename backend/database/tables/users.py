@@ -4,6 +4,7 @@ from sqlalchemy import Uuid
 from .base import Base
 from .sessions import SessionsTable
 from .user_prompts import UserPromptsTable
+from .story_jobs import StoryJobsTable
 
 
 class UsersTable(Base):
@@ -26,4 +27,9 @@ class UsersTable(Base):
         UserPromptsTable,
         cascade="all, delete-orphan",
         default_factory=list,
-    )
\ No newline at end of file
+    )
+    _story_jobs: Mapped[list[StoryJobsTable]] = relationship(
+        StoryJobsTable,
+        cascade="all, delete-orphan",
+        default_factory=list,
+    )
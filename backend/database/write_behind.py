@@ -0,0 +1,215 @@
+"""
+Write-behind buffer for inserts.
+
+Rows inserted by concurrent requests are queued and written together with a single
+multi-row `INSERT ... RETURNING`, trading a few milliseconds of latency for far fewer
+round-trips and commits.
+
+Durability: `insert` only returns once the transaction holding the row has committed,
+so an acknowledged row is as durable as one inserted directly. Rows still queued when
+the process dies were never acknowledged to anyone. On shutdown the queue is flushed
+before the engine is disposed. A caller that goes away after queueing its row (e.g. a
+client disconnect) doesn't take the row back, it is still written.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy import Row, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute
+
+from backend.settings.database import DatabaseSettings
+
+from .functions import get_db_session
+from .tables import UserPromptsTable
+
+__all__ = ["WriteBehindBuffer", "user_prompts_writer"]
+
+logger = logging.getLogger(__name__)
+
+database_settings: DatabaseSettings = DatabaseSettings()  # type: ignore
+
+_Pending = tuple[dict[str, Any], asyncio.Future]
+_Insert = Callable[[list[dict[str, Any]]], Awaitable[Sequence[Row]]]
+
+
+class WriteBehindBuffer:
+    """
+    Groups inserts into `table` from concurrent callers.
+
+    Rows must carry their primary key (`id`, generated client side) so the returned
+    rows can be matched to their callers. If a batch fails on a constraint it is split
+    and retried, so only the offending rows fail. `insert_rows` replaces the database
+    insert, it must return the `returning` columns of the rows it was given.
+    """
+
+    def __init__(
+        self,
+        table: type,
+        returning: Sequence[InstrumentedAttribute],
+        delay: float,
+        max_batch: int,
+        max_pending: int,
+        close_timeout: float = 30.0,
+        insert_rows: _Insert | None = None,
+    ) -> None:
+        self.table = table
+        self.returning = returning
+        self.delay = delay
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.close_timeout = close_timeout
+        self._insert_rows = insert_rows or self._insert_into_table
+
+        self._queue: asyncio.Queue[_Pending] | None = None
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+        self.rows = 0
+        self.batches = 0
+
+    async def insert(self, values: dict[str, Any]) -> Row:
+        """
+        Queue a row and wait until it is committed. Returns the `returning` columns.
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        if self._closed:
+            await self._flush([(values, future)])
+        else:
+            await self._start().put((values, future))
+
+        return await future
+
+    async def close(self) -> None:
+        """
+        Flush queued rows and stop the background task. Later inserts are written directly.
+
+        Rows the task can't flush within `close_timeout` (or at all, if it died) are
+        dropped: their callers get an error.
+        """
+        self._closed = True
+        if self._queue is None or self._task is None:
+            return
+
+        if not self._task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.close_timeout)
+            except TimeoutError:
+                logger.error("Write-behind flush did not finish in %ss", self.close_timeout)
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._drop(self._queue)
+        self._queue = self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def _start(self) -> asyncio.Queue[_Pending]:
+        if self._queue is None or self._task is None or self._task.done():
+            if self._queue is not None:
+                self._drop(self._queue)
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.create_task(self._run(self._queue))
+
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[_Pending]) -> None:
+        while True:
+            batch = [await queue.get()]
+            try:
+                if queue.qsize() < self.max_batch - 1:
+                    # Give concurrent requests a moment to join the batch
+                    await asyncio.sleep(self.delay)
+
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                await self._flush(batch)
+            finally:
+                for _, future in batch:
+                    # Only left pending if the task is cancelled or fails mid-batch
+                    self._resolve(future, exception=RuntimeError("Write-behind buffer stopped"))
+                    queue.task_done()
+
+    def _drop(self, queue: asyncio.Queue[_Pending]) -> None:
+        """
+        Fail the rows left in the queue of a stopped task, nothing would ever write them.
+        """
+        dropped: list[_Pending] = []
+        while not queue.empty():
+            dropped.append(queue.get_nowait())
+            queue.task_done()
+
+        if dropped:
+            logger.error(
+                "Write-behind buffer stopped, dropping %s queued rows: %s",
+                len(dropped),
+                ", ".join(str(values.get("id")) for values, _ in dropped),
+            )
+        for _, future in dropped:
+            self._resolve(future, exception=RuntimeError("Write-behind buffer stopped"))
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        try:
+            rows = await self._insert([values for values, _ in batch])
+        except IntegrityError as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exception=e)
+                return
+
+            # Split until the offending rows are isolated
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+            return
+
+        except Exception as e:
+            logger.exception("Write-behind batch of %s rows failed", len(batch))
+            for _, future in batch:
+                self._resolve(future, exception=e)
+            return
+
+        by_id = {row.id: row for row in rows}
+        for values, future in batch:
+            self._resolve(future, result=by_id[values["id"]])
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> Sequence[Row]:
+        returned = await self._insert_rows(rows)
+        self.rows += len(rows)
+        self.batches += 1
+        return returned
+
+    async def _insert_into_table(self, rows: list[dict[str, Any]]) -> Sequence[Row]:
+        async with get_db_session() as session:
+            result = await session.execute(insert(self.table).values(rows).returning(*self.returning))
+            returned = result.all()
+            await session.commit()
+
+        return returned
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, exception: BaseException | None = None) -> None:
+        if future.done():
+            return
+
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+user_prompts_writer = WriteBehindBuffer(
+    UserPromptsTable,
+    returning=(UserPromptsTable.id, UserPromptsTable.date_created),
+    delay=database_settings.DATABASE_WRITE_BEHIND_DELAY_SECONDS,
+    max_batch=database_settings.DATABASE_WRITE_BEHIND_MAX_BATCH,
+    max_pending=database_settings.DATABASE_WRITE_BEHIND_MAX_PENDING,
+)
@@ -0,0 +1,249 @@
+"""
+Minimal in-process metrics registry rendered in the Prometheus text format.
+
+Metrics are kept per worker process: with several workers each one exposes its own
+values and the scraper aggregates them.
+"""
+
+from contextlib import contextmanager
+from math import inf
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Iterator, Mapping
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "StatsGauges",
+    "DEFAULT_BUCKETS",
+    "registry",
+]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._collectors: dict[str, "Metric | StatsGauges"] = {}
+
+    def register(self, collector: "Metric | StatsGauges") -> None:
+        if collector.name in self._collectors:
+            raise ValueError(f"Metric {collector.name} already registered")
+
+        self._collectors[collector.name] = collector
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for collector in self._collectors.values():
+            lines.extend(collector.collect())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Registry = registry,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = Lock()
+        registry.register(self)
+
+    def labels(self, *values: Any, **labels: Any) -> Any:
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+
+        return child
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {_escape(self.documentation)}"
+        yield f"# TYPE {self.name} {self.type}"
+        for values, child in list(self._children.items()):
+            yield from self._samples(values, child)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _samples(self, values: tuple[str, ...], child: Any) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing value. Names should end with `_total`.
+    """
+
+    type = "counter"
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self, values: tuple[str, ...], child: _Value) -> Iterator[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down.
+    """
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry = registry,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets)) + ((inf,) if buckets[-1] != inf else ())
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _samples(self, values: tuple[str, ...], child: _HistogramValue) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(child.buckets, child.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+        yield f"{self.name}_count{labels} {child.count}"
+
+
+class StatsGauges:
+    """
+    Expose the numeric values of an existing `stats()` dict as gauges named
+    `<name>_<key>`, read at scrape time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        stats: Callable[[], Mapping[str, Any]],
+        registry: Registry = registry,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.stats = stats
+        registry.register(self)
+
+    def collect(self) -> Iterator[str]:
+        for key, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+
+            name = f"{self.name}_{key}"
+            yield f"# HELP {name} {_escape(self.documentation)}: {key}"
+            yield f"# TYPE {name} gauge"
+            yield f"{name} {_format_value(value)}"
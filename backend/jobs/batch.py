@@ -0,0 +1,204 @@
+"""
+Offline story generation through the provider Batch API.
+
+Requests are written to a JSONL file, one per (user, comedian), and submitted as a
+batch, which is cheaper than real-time completions but may take up to the completion
+window. Results are bulk-loaded into `user_prompts` with COPY. The prompt of each
+request is read back from the input file, so an interrupted run can be resumed from
+the batch id alone.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterable
+from uuid import UUID, uuid4
+
+from openai.types import Batch
+from sqlalchemy import select
+
+from backend.comedians.base import BaseComedian, MetaComedian
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.functions import get_db_session, init_engine
+from backend.database.tables import UserPromptsTable, UsersTable
+from backend.llm.client import LLMClient
+from backend.llm.messages import STORY_MAX_TOKENS, STORY_MODEL, STORY_TEMPERATURE, build_story_messages
+from backend.llm.parsing import STORY_RESPONSE_FORMAT, StoryParseError, story_parser
+
+__all__ = [
+    "BatchResults",
+    "BATCH_ENDPOINT",
+    "BATCH_MAX_REQUESTS",
+    "build_batch_file",
+    "submit_batch",
+    "wait_for_batch",
+    "read_batch_results",
+    "copy_stories",
+    "get_user_ids",
+]
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_MAX_REQUESTS = 50000  # Provider limit per batch
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+USER_PROMPTS_COLUMNS = ("id", "user_id", "prompt", "date_created", "comedian", "title", "story")
+
+
+@dataclass
+class BatchResults:
+    records: list[tuple[Any, ...]] = field(default_factory=list)  # Rows of `USER_PROMPTS_COLUMNS`
+    failed: int = 0
+
+
+async def get_user_ids(user_ids: Iterable[UUID] = ()) -> list[UUID]:
+    """
+    Ids of the given users that exist, or of every user when none are given.
+    """
+    statement = select(UsersTable.id).order_by(UsersTable.id)
+    if user_ids := list(user_ids):
+        statement = statement.where(UsersTable.id.in_(user_ids))
+
+    async with get_db_session() as session:
+        return list((await session.scalars(statement)).all())
+
+
+def build_batch_file(user_ids: list[UUID], comedians: list[type[BaseComedian]], prompt: str) -> bytes:
+    """
+    JSONL input of a batch, one chat completion request per (user, comedian).
+    """
+    lines = []
+    for user_id in user_ids:
+        for comedian in comedians:
+            request = {
+                "custom_id": f"{user_id}:{comedian.name.value}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": STORY_MODEL,
+                    "messages": build_story_messages(comedian, prompt),
+                    "max_tokens": STORY_MAX_TOKENS,
+                    "temperature": STORY_TEMPERATURE,
+                    "response_format": STORY_RESPONSE_FORMAT,
+                },
+            }
+            lines.append(json.dumps(request, ensure_ascii=False))
+
+    return "\n".join(lines).encode("utf-8")
+
+
+async def submit_batch(client: LLMClient, content: bytes, metadata: dict[str, str] | None = None) -> Batch:
+    input_file = await client.openai.files.create(file=("stories.jsonl", content), purpose="batch")
+
+    return await client.openai.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata=metadata,
+    )
+
+
+async def wait_for_batch(client: LLMClient, batch_id: str, poll_interval: float) -> Batch:
+    """
+    Poll the batch until it reaches a final status.
+    """
+    while True:
+        batch = await client.openai.batches.retrieve(batch_id)
+        if batch.status in BATCH_FINAL_STATUSES:
+            return batch
+
+        counts = batch.request_counts
+        logger.info(
+            "Batch %s %s: %s/%s done",
+            batch_id,
+            batch.status,
+            counts.completed + counts.failed if counts else 0,
+            counts.total if counts else "?",
+        )
+        await asyncio.sleep(poll_interval)
+
+
+async def _read_jsonl(client: LLMClient, file_id: str | None) -> Iterable[dict[str, Any]]:
+    if not file_id:
+        return []
+
+    content = await client.openai.files.content(file_id)
+    return (json.loads(line) for line in content.text.splitlines() if line.strip())
+
+
+def _request_error(line: dict[str, Any]) -> Any:
+    return line.get("error") or f"status {(line.get('response') or {}).get('status_code')}"
+
+
+async def read_batch_results(client: LLMClient, batch: Batch) -> BatchResults:
+    """
+    Parse the output of a finished batch into `user_prompts` rows.
+
+    Failed requests and unusable outputs are counted and skipped, there is no re-ask.
+    """
+    prompts = {
+        request["custom_id"]: request["body"]["messages"][-1]["content"]
+        for request in await _read_jsonl(client, batch.input_file_id)
+    }
+    results = BatchResults()
+    date_created = datetime.now(timezone.utc)
+
+    for line in await _read_jsonl(client, batch.output_file_id):
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            logger.warning("Batch request %s failed: %s", line.get("custom_id"), _request_error(line))
+            results.failed += 1
+            continue
+
+        user_id, comedian_name = line["custom_id"].split(":")
+        try:
+            story = story_parser.parse(response["body"]["choices"][0]["message"]["content"] or "")
+        except (StoryParseError, KeyError, IndexError):
+            logger.warning("Batch request %s returned an invalid story", line["custom_id"])
+            results.failed += 1
+            continue
+
+        comedian = MetaComedian.get_comedian(ComedianStrEnum(comedian_name))
+        results.records.append(
+            (
+                uuid4(),
+                UUID(user_id),
+                prompts[line["custom_id"]],
+                date_created,
+                comedian.name.name,  # Enums are stored by name
+                story.title,
+                story.story,
+            )
+        )
+
+    # Requests in the error file (e.g. expired) never got a response line
+    for line in await _read_jsonl(client, batch.error_file_id):
+        logger.warning("Batch request %s failed: %s", line.get("custom_id"), _request_error(line))
+        results.failed += 1
+
+    return results
+
+
+async def copy_stories(records: list[tuple[Any, ...]]) -> None:
+    """
+    Bulk-load `user_prompts` rows with COPY, a single statement, so it's all or nothing.
+    """
+    if not records:
+        return
+
+    async with init_engine().connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        # SQLAlchemy doesn't see statements sent on the asyncpg connection (it only begins
+        # its transaction on its own first statement), so the COPY gets an explicit one
+        # there: it commits or rolls back before the connection goes back to the pool
+        async with driver_connection.transaction():  # type: ignore
+            await driver_connection.copy_records_to_table(  # type: ignore
+                UserPromptsTable.__tablename__,
+                records=records,
+                columns=USER_PROMPTS_COLUMNS,
+            )
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, func, insert, or_, select, update
+
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.enums.jobs import JobStatusStrEnum
+from backend.database.functions import get_db_session
+from backend.database.tables import StoryJobsTable, UserPromptsTable
+from backend.settings.jobs import JobsSettings
+
+__all__ = ["ClaimedJob", "enqueue_job", "claim_job", "complete_job", "fail_job", "release_job"]
+
+jobs_settings: JobsSettings = JobsSettings()
+
+
+@dataclass
+class ClaimedJob:
+    id: UUID
+    user_id: UUID
+    prompt: str
+    comedian: ComedianStrEnum
+    use_cache: bool
+    attempts: int
+
+
+async def enqueue_job(
+    user_id: UUID,
+    prompt: str,
+    comedian: ComedianStrEnum,
+    use_cache: bool = True,
+) -> StoryJobsTable:
+    async with get_db_session() as session:
+        result = await session.scalars(
+            insert(StoryJobsTable)
+            .values(
+                id=uuid4(),
+                user_id=user_id,
+                prompt=prompt,
+                comedian=comedian,
+                use_cache=use_cache,
+                date_created=func.now(),
+                date_updated=func.now(),
+            )
+            .returning(StoryJobsTable)
+        )
+        job = result.one()
+        # Keep the returned values, the commit would expire them
+        session.expunge(job)
+        await session.commit()
+
+    return job
+
+
+async def claim_job() -> ClaimedJob | None:
+    """
+    Lock the oldest runnable job and mark it as running.
+
+    Runnable jobs are pending ones not delayed by `release_job`, and running ones whose
+    lease expired (their worker died). `FOR UPDATE SKIP LOCKED` lets concurrent workers
+    claim different jobs.
+    """
+    runnable = (
+        select(StoryJobsTable.id)
+        .where(
+            or_(
+                and_(
+                    StoryJobsTable.status == JobStatusStrEnum.PENDING,
+                    or_(StoryJobsTable.run_after.is_(None), StoryJobsTable.run_after <= func.now()),
+                ),
+                and_(
+                    StoryJobsTable.status == JobStatusStrEnum.RUNNING,
+                    StoryJobsTable.locked_until < func.now(),
+                ),
+            )
+        )
+        .order_by(StoryJobsTable.date_created)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+    async with get_db_session() as session:
+        result = await session.execute(
+            update(StoryJobsTable)
+            .where(StoryJobsTable.id == runnable.scalar_subquery())
+            .values(
+                status=JobStatusStrEnum.RUNNING,
+                attempts=StoryJobsTable.attempts + 1,
+                locked_until=func.now() + timedelta(seconds=jobs_settings.JOBS_LEASE_SECONDS),
+                run_after=None,
+                date_updated=func.now(),
+            )
+            .returning(
+                StoryJobsTable.id,
+                StoryJobsTable.user_id,
+                StoryJobsTable.prompt,
+                StoryJobsTable.comedian,
+                StoryJobsTable.use_cache,
+                StoryJobsTable.attempts,
+            )
+        )
+        row = result.one_or_none()
+        await session.commit()
+
+    return None if row is None else ClaimedJob(**row._asdict())
+
+
+async def complete_job(job: ClaimedJob, title: str, story: str) -> UUID:
+    """
+    Store the generated story and mark the job as succeeded, in one transaction.
+    """
+    new_prompt = UserPromptsTable(
+        user_id=job.user_id,
+        prompt=job.prompt,
+        comedian=job.comedian,
+        date_created=func.now(),
+        title=title or "No title generated",
+        story=story or "No story generated",
+    )
+
+    async with get_db_session() as session:
+        session.add(new_prompt)
+        await session.flush()
+        await session.execute(
+            update(StoryJobsTable)
+            .where(StoryJobsTable.id == job.id)
+            .values(
+                status=JobStatusStrEnum.SUCCEEDED,
+                story_id=new_prompt.id,
+                locked_until=None,
+                error=None,
+                date_updated=func.now(),
+            )
+        )
+        await session.commit()
+
+    return new_prompt.id
+
+
+async def fail_job(job: ClaimedJob, error: str, retry: bool = True) -> None:
+    """
+    Put the job back in the queue, or mark it as failed once out of attempts.
+    """
+    retry = retry and job.attempts < jobs_settings.JOBS_MAX_ATTEMPTS
+
+    async with get_db_session() as session:
+        await session.execute(
+            update(StoryJobsTable)
+            .where(StoryJobsTable.id == job.id)
+            .values(
+                status=JobStatusStrEnum.PENDING if retry else JobStatusStrEnum.FAILED,
+                locked_until=None,
+                error=error,
+                date_updated=func.now(),
+            )
+        )
+        await session.commit()
+
+
+async def release_job(job: ClaimedJob, delay: float = 0) -> None:
+    """
+    Put the job back in the queue without counting the attempt. It can't be claimed
+    again for `delay` seconds, so it doesn't hold the head of the queue meanwhile.
+    """
+    async with get_db_session() as session:
+        await session.execute(
+            update(StoryJobsTable)
+            .where(StoryJobsTable.id == job.id)
+            .values(
+                status=JobStatusStrEnum.PENDING,
+                attempts=StoryJobsTable.attempts - 1,
+                locked_until=None,
+                run_after=func.now() + timedelta(seconds=delay),
+                date_updated=func.now(),
+            )
+        )
+        await session.commit()
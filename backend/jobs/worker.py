@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import signal
+
+from backend.comedians.base import MetaComedian
+from backend.database.functions import dispose_engine, init_engine
+from backend.llm.admission import AdmissionRejected
+from backend.llm.client import LLMClient, close_llm_client, init_llm_client
+from backend.llm.resilience import CircuitOpenError
+from backend.llm.stories import generate_story
+
+from .queue import ClaimedJob, claim_job, complete_job, fail_job, jobs_settings, release_job
+
+__all__ = ["run_worker"]
+
+logger = logging.getLogger(__name__)
+
+
+async def process_job(client: LLMClient, job: ClaimedJob) -> float:
+    """
+    Process a claimed job. Returns the seconds to wait before claiming another one.
+    """
+    try:
+        comedian = MetaComedian.get_comedian(job.comedian)
+        story = await generate_story(
+            client, comedian, job.prompt, job.user_id, use_cache=job.use_cache
+        )
+    except (AdmissionRejected, CircuitOpenError) as e:
+        # Over the LLM limits or upstream down: let it be claimed again later
+        await release_job(job, e.retry_after)
+        # Other users' jobs can still run when only this user is over their limits
+        if isinstance(e, AdmissionRejected) and e.reason.startswith("user"):
+            return 0
+        return e.retry_after
+    except ValueError as e:
+        # Unknown comedian or unparseable output, retrying won't help
+        logger.warning("Job %s failed: %s", job.id, e)
+        await fail_job(job, str(e), retry=False)
+        return 0
+    except Exception as e:
+        logger.exception("Job %s failed", job.id)
+        await fail_job(job, str(e) or type(e).__name__)
+        return 0
+
+    await complete_job(job, story.title, story.story)
+    return 0
+
+
+async def run_worker(concurrency: int | None = None) -> None:
+    """
+    Drain the jobs queue with `concurrency` jobs in flight until SIGINT/SIGTERM.
+
+    Jobs being processed when the worker is stopped are finished first.
+    """
+    concurrency = concurrency or jobs_settings.JOBS_CONCURRENCY
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    init_engine()
+    client = init_llm_client()
+
+    async def consume() -> None:
+        while not stop.is_set():
+            try:
+                job = await claim_job()
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+
+            if job is None:
+                delay = jobs_settings.JOBS_POLL_INTERVAL_SECONDS
+            else:
+                delay = await process_job(client, job)
+
+            if delay:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+
+    try:
+        await asyncio.gather(*(consume() for _ in range(concurrency)))
+    finally:
+        await close_llm_client()
+        await dispose_engine()
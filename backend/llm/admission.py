@@ -0,0 +1,228 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator
+from uuid import UUID
+
+from backend.extra.ttl_cache import TTLCache
+from backend.settings.openai import OpenaiSettings
+
+__all__ = ["AdmissionRejected", "AdmissionController", "TokenBucket", "admission"]
+
+openai_settings: OpenaiSettings = OpenaiSettings()
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a call could not be admitted within the maximum wait.
+    """
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` tokens per minute.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` tokens are available (0 if they are available now).
+        """
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        # Requests bigger than the bucket would never fit, let them drain it entirely
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class _UserQuota:
+    def __init__(self, max_concurrency: int, requests_per_minute: float) -> None:
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.users = 0  # Callers waiting for or holding a slot
+
+
+class AdmissionController:
+    """
+    Admission control for LLM calls.
+
+    Each user is limited in concurrent requests and requests per minute
+    (`admit_user`). Upstream calls are limited globally in concurrency, requests per
+    minute and tokens per minute (`admit_upstream`). Callers queue until they fit, and
+    are rejected with `AdmissionRejected` if that takes longer than `max_wait`.
+
+    A concurrency slot is acquired before the rate budget is consumed, so rejected
+    callers don't burn budget. Quotas in use are kept apart from the expiring cache of
+    idle ones: an evicted quota with held slots would double the user's concurrency.
+    """
+
+    USER_QUOTA_TTL_SECONDS = 300
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        user_max_concurrency: int,
+        user_requests_per_minute: float,
+        max_wait: float,
+    ) -> None:
+        self.max_wait = max_wait
+        self.user_max_concurrency = user_max_concurrency
+        self.user_requests_per_minute = user_requests_per_minute
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._users: TTLCache[UUID, _UserQuota] = TTLCache(
+            maxsize=100_000, ttl=self.USER_QUOTA_TTL_SECONDS
+        )
+        self._active_users: dict[UUID, _UserQuota] = {}
+
+        self.admitted = 0
+        self.rejected = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.tokens_admitted = 0
+
+    @asynccontextmanager
+    async def admit_user(
+        self,
+        user_id: UUID,
+        requests: int = 1,
+        concurrency: int = 1,
+    ) -> AsyncIterator[int]:
+        """
+        Admit `requests` requests of a user at once, charged together against the user's
+        requests per minute. They run on up to `concurrency` of the user's concurrency
+        slots: the first one is waited for, the others are only taken if free right away.
+        Yields the number of slots held, the most requests the caller may run at once.
+        """
+        quota = self._active_users.get(user_id) or self._users.get(user_id)
+        if quota is None:
+            quota = _UserQuota(self.user_max_concurrency, self.user_requests_per_minute)
+        self._users.pop(user_id)
+        self._active_users[user_id] = quota
+        quota.users += 1
+
+        try:
+            async with self._admit(
+                quota.semaphore, "user", (quota.requests, requests), slots=concurrency
+            ) as slots:
+                yield slots
+        finally:
+            quota.users -= 1
+            if quota.users == 0:
+                del self._active_users[user_id]
+                self._users.set(user_id, quota)
+
+    @asynccontextmanager
+    async def admit_upstream(self, estimated_tokens: int) -> AsyncIterator[None]:
+        async with self._admit(
+            self._semaphore,
+            "upstream",
+            (self._requests, 1),
+            (self._tokens, estimated_tokens),
+        ):
+            self.admitted += 1
+            self.tokens_admitted += estimated_tokens
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "tokens_admitted": self.tokens_admitted,
+            "users": len(self._users) + len(self._active_users),
+            "requests_available": self._requests.tokens,
+            "tokens_available": self._tokens.tokens,
+        }
+
+    @asynccontextmanager
+    async def _admit(
+        self,
+        semaphore: asyncio.Semaphore,
+        scope: str,
+        *buckets: tuple[TokenBucket, float],
+        slots: int = 1,
+    ) -> AsyncIterator[int]:
+        deadline = monotonic() + self.max_wait
+        held = 0
+        self.waiting += 1
+        try:
+            await self._acquire(semaphore, deadline, f"{scope} concurrency limit")
+            held = 1
+            # Waiting for more slots could deadlock two callers holding part of them
+            while held < slots and not semaphore.locked():
+                await semaphore.acquire()
+                held += 1
+            await self._wait_for_buckets(deadline, f"{scope} rate limit", *buckets)
+        except BaseException:
+            for _ in range(held):
+                semaphore.release()
+            raise
+        finally:
+            self.waiting -= 1
+
+        try:
+            yield held
+        finally:
+            for _ in range(held):
+                semaphore.release()
+
+    async def _wait_for_buckets(
+        self,
+        deadline: float,
+        reason: str,
+        *buckets: tuple[TokenBucket, float],
+    ) -> None:
+        while True:
+            wait = max(bucket.wait_time(amount) for bucket, amount in buckets)
+            if wait == 0:
+                for bucket, amount in buckets:
+                    bucket.consume(amount)
+                return
+
+            if monotonic() + wait > deadline:
+                self.rejected += 1
+                raise AdmissionRejected(reason, retry_after=wait)
+
+            await asyncio.sleep(wait)
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, deadline: float, reason: str) -> None:
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, deadline - monotonic()))
+        except TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected(reason, retry_after=1.0) from None
+
+
+admission = AdmissionController(
+    max_concurrency=openai_settings.OPENAI_MAX_CONCURRENCY,
+    requests_per_minute=openai_settings.OPENAI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=openai_settings.OPENAI_TOKENS_PER_MINUTE,
+    user_max_concurrency=openai_settings.OPENAI_USER_MAX_CONCURRENCY,
+    user_requests_per_minute=openai_settings.OPENAI_USER_REQUESTS_PER_MINUTE,
+    max_wait=openai_settings.OPENAI_ADMISSION_MAX_WAIT_SECONDS,
+)
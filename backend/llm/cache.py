@@ -0,0 +1,181 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime, timedelta
+from hashlib import sha256
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.comedians.base import BaseComedian
+from backend.database.functions import get_db_session
+from backend.database.tables import GenerationCacheTable
+from backend.extra.ttl_cache import TTLCache
+from backend.llm.messages import get_template_version
+from backend.settings.openai import OpenaiSettings
+
+__all__ = [
+    "GenerationCache",
+    "MemoryGenerationCache",
+    "PostgresGenerationCache",
+    "get_generation_cache",
+    "get_generation_cache_key",
+]
+
+openai_settings: OpenaiSettings = OpenaiSettings()
+
+
+def get_generation_cache_key(
+    comedian: type[BaseComedian],
+    prompt: str,
+    model: str,
+    temperature: float,
+) -> str:
+    """
+    Cache key of a generation. Prompts differing only in case or whitespace share a key.
+    """
+    normalized_prompt = " ".join(prompt.casefold().split())
+    payload = json.dumps(
+        [comedian.name, get_template_version(comedian), normalized_prompt, model, temperature],
+        ensure_ascii=False,
+    )
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache(ABC):
+    """
+    Cache of generated `{"title", "story"}` objects.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> dict[str, str] | None:
+        story = await self._get(key)
+        if story is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return story
+
+    async def set(self, key: str, story: dict[str, str]) -> None:
+        await self._set(key, {"title": story["title"], "story": story["story"]})
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    @abstractmethod
+    async def _get(self, key: str) -> dict[str, str] | None: ...
+
+    @abstractmethod
+    async def _set(self, key: str, story: dict[str, str]) -> None: ...
+
+
+class MemoryGenerationCache(GenerationCache):
+    """
+    In-process LRU cache. Each worker keeps its own entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        super().__init__(ttl, max_entries)
+        self._cache: TTLCache[str, dict[str, str]] = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def _get(self, key: str) -> dict[str, str] | None:
+        return self._cache.get(key)
+
+    async def _set(self, key: str, story: dict[str, str]) -> None:
+        self._cache.set(key, story)
+
+
+class PostgresGenerationCache(GenerationCache):
+    """
+    Cache shared by every worker, stored in the `generation_cache` table.
+
+    Expired entries, and the oldest ones above `max_entries`, are evicted every
+    `EVICT_EVERY` writes.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        super().__init__(ttl, max_entries)
+        self._writes = 0
+
+    async def _get(self, key: str) -> dict[str, str] | None:
+        async with get_db_session() as session:
+            result = await session.execute(
+                select(GenerationCacheTable.title, GenerationCacheTable.story).where(
+                    GenerationCacheTable.key == key,
+                    GenerationCacheTable.expires > func.now(),
+                )
+            )
+            row = result.one_or_none()
+
+        return None if row is None else {"title": row.title, "story": row.story}
+
+    async def _set(self, key: str, story: dict[str, str]) -> None:
+        now = datetime.now(UTC)
+        statement = insert(GenerationCacheTable).values(
+            key=key,
+            title=story["title"],
+            story=story["story"],
+            date_created=now,
+            expires=now + timedelta(seconds=self.ttl),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[GenerationCacheTable.key],
+            set_={
+                "title": statement.excluded.title,
+                "story": statement.excluded.story,
+                "date_created": statement.excluded.date_created,
+                "expires": statement.excluded.expires,
+            },
+        )
+
+        async with get_db_session() as session:
+            await session.execute(statement)
+            await session.commit()
+
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            await self.evict()
+
+    async def evict(self) -> None:
+        newest = (
+            select(GenerationCacheTable.key)
+            .order_by(GenerationCacheTable.date_created.desc())
+            .limit(self.max_entries)
+        )
+
+        async with get_db_session() as session:
+            await session.execute(
+                delete(GenerationCacheTable).where(
+                    (GenerationCacheTable.expires <= func.now())
+                    | GenerationCacheTable.key.not_in(newest.scalar_subquery())
+                )
+            )
+            await session.commit()
+
+
+_cache: GenerationCache | None = None
+
+
+def get_generation_cache() -> GenerationCache | None:
+    """
+    Return the configured cache, or None when caching is disabled.
+    """
+    global _cache
+
+    if openai_settings.OPENAI_CACHE_BACKEND == "none":
+        return None
+
+    if _cache is None:
+        backend = {"memory": MemoryGenerationCache, "postgres": PostgresGenerationCache}
+        _cache = backend[openai_settings.OPENAI_CACHE_BACKEND](
+            ttl=openai_settings.OPENAI_CACHE_TTL_SECONDS,
+            max_entries=openai_settings.OPENAI_CACHE_MAX_ENTRIES,
+        )
+
+    return _cache
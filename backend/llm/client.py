@@ -0,0 +1,163 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+from openai import AsyncOpenAI, AsyncStream
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from backend.settings.openai import OpenaiSettings
+
+from .admission import admission
+from .resilience import ResilientCaller
+
+__all__ = ["LLMClient", "init_llm_client", "close_llm_client", "get_llm_client"]
+
+
+class LLMClient:
+    """
+    OpenAI client backed by a single pooled `httpx.AsyncClient`.
+
+    One instance is shared by the whole worker process so connections (and their TLS
+    sessions) are kept alive between requests. Calls run under the resilience policy
+    (retries, deadline, circuit breaker and hedging), and every attempt, retries and
+    hedges included, is admitted against the upstream limits (`admit_upstream`).
+    """
+
+    def __init__(
+        self,
+        settings: OpenaiSettings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.settings = settings or OpenaiSettings()
+
+        self.http_client = httpx.AsyncClient(
+            transport=transport,
+            http2=self.settings.OPENAI_HTTP2,
+            limits=httpx.Limits(
+                max_connections=self.settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=self.settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                self.settings.OPENAI_TIMEOUT_SECONDS,
+                connect=self.settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+        self.openai = AsyncOpenAI(
+            api_key=self.settings.OPENAI_API_KEY,
+            base_url=self.settings.OPENAI_BASE_URL,
+            max_retries=self.settings.OPENAI_MAX_RETRIES,
+            http_client=self.http_client,
+        )
+        self.resilience = ResilientCaller(
+            attempts=self.settings.OPENAI_RETRY_ATTEMPTS,
+            backoff=self.settings.OPENAI_RETRY_BACKOFF_SECONDS,
+            backoff_max=self.settings.OPENAI_RETRY_BACKOFF_MAX_SECONDS,
+            deadline=self.settings.OPENAI_DEADLINE_SECONDS,
+            failure_threshold=self.settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.settings.OPENAI_CIRCUIT_RESET_SECONDS,
+            hedge_percentile=self.settings.OPENAI_HEDGE_PERCENTILE,
+            hedge_min_samples=self.settings.OPENAI_HEDGE_MIN_SAMPLES,
+        )
+
+    @property
+    def api_key(self) -> str:
+        return self.settings.OPENAI_API_KEY
+
+    async def create_completion(
+        self,
+        messages: list[dict[str, Any]],
+        estimated_tokens: int,
+        timeout: float | None = None,
+        **params: Any,
+    ) -> ChatCompletion:
+        """
+        Create a chat completion. Each attempt waits for its own upstream admission (a
+        concurrency slot and `estimated_tokens` of the rate budget), the slot is not held
+        during backoff. Raises `AdmissionRejected` when an attempt can't be admitted.
+        """
+
+        async def attempt() -> ChatCompletion:
+            async with admission.admit_upstream(estimated_tokens):
+                return await self.openai.chat.completions.create(
+                    messages=messages,  # type: ignore
+                    timeout=timeout or self.settings.OPENAI_TIMEOUT_SECONDS,
+                    stream=False,
+                    **params,
+                )
+
+        return await self.resilience.call(attempt)
+
+    @asynccontextmanager
+    async def stream_completion(
+        self,
+        messages: list[dict[str, Any]],
+        estimated_tokens: int,
+        timeout: float | None = None,
+        **params: Any,
+    ) -> AsyncIterator[AsyncStream[ChatCompletionChunk]]:
+        """
+        Stream a chat completion. The upstream admission of the attempt that opened the
+        stream is held until the stream is closed.
+
+        Only opening the stream goes through the resilience policy, without hedging: once
+        chunks have been forwarded to the caller the call can't be transparently retried.
+        """
+
+        async def attempt() -> tuple[AsyncStream[ChatCompletionChunk], AsyncExitStack]:
+            admitted = AsyncExitStack()
+            await admitted.enter_async_context(admission.admit_upstream(estimated_tokens))
+            try:
+                stream = await self.openai.chat.completions.create(
+                    messages=messages,  # type: ignore
+                    timeout=timeout or self.settings.OPENAI_TIMEOUT_SECONDS,
+                    stream=True,
+                    **params,
+                )
+            except BaseException:
+                await admitted.aclose()
+                raise
+
+            return stream, admitted
+
+        stream, admitted = await self.resilience.call(attempt, hedge=False)
+        async with admitted:
+            try:
+                yield stream
+            finally:
+                await stream.close()
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
+
+
+_client: LLMClient | None = None
+
+
+def init_llm_client() -> LLMClient:
+    """
+    Create the shared client once per process.
+    """
+    global _client
+
+    if _client is None:
+        _client = LLMClient()
+
+    return _client
+
+
+async def close_llm_client() -> None:
+    global _client
+
+    if _client is None:
+        return
+
+    client, _client = _client, None
+    await client.close()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Return the shared client. Usable as a FastAPI dependency.
+    """
+    return init_llm_client()
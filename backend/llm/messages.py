@@ -0,0 +1,31 @@
+from backend.comedians.base import BaseComedian
+from backend.llm.tokens import count_tokens
+
+STORY_MODEL = "gpt-4o"
+STORY_MAX_TOKENS = 1024
+STORY_TEMPERATURE = 0.7
+
+
+def build_story_messages(comedian: type[BaseComedian], prompt: str) -> list[dict[str, str]]:
+    """
+    Build the chat messages used to generate a story narrated by `comedian`: its
+    precompiled template followed by the user prompt.
+    """
+    return [
+        *({"role": role, "content": content} for role, content in comedian.template.messages),
+        {"role": "user", "content": prompt},
+    ]
+
+
+def get_template_version(comedian: type[BaseComedian]) -> str:
+    """
+    Short hash of everything in the messages of `comedian` except the user prompt.
+    """
+    return comedian.template.version
+
+
+def estimate_story_tokens(comedian: type[BaseComedian], prompt: str) -> int:
+    """
+    Upper bound of the tokens used by a generation: template, prompt and the completion limit.
+    """
+    return comedian.template.tokens + count_tokens(prompt) + STORY_MAX_TOKENS
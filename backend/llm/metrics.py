@@ -0,0 +1,45 @@
+from typing import Any
+
+from backend.extra.metrics import Counter, Histogram
+from backend.settings.openai import OpenaiSettings
+
+__all__ = ["LLM_REQUEST_DURATION", "LLM_TOKENS", "LLM_COST", "record_llm_usage"]
+
+openai_settings: OpenaiSettings = OpenaiSettings()
+
+LLM_REQUEST_DURATION = Histogram(
+    "sorna_llm_request_duration_seconds",
+    "LLM call latency by comedian, retries included (streams until the last chunk)",
+    ("comedian", "mode", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "sorna_llm_tokens_total",
+    "LLM tokens used by comedian",
+    ("comedian", "kind"),
+)
+LLM_COST = Counter(
+    "sorna_llm_cost_dollars_total",
+    "Estimated LLM cost by comedian, from the configured prices",
+    ("comedian",),
+)
+
+
+def record_llm_usage(comedian: str, usage: Any) -> None:
+    """
+    Count the tokens and cost of a completion from its `usage` (ignored when missing).
+    """
+    if usage is None:
+        return
+
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+
+    LLM_TOKENS.labels(comedian, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(comedian, "completion").inc(completion_tokens)
+    LLM_COST.labels(comedian).inc(
+        (
+            prompt_tokens * openai_settings.OPENAI_PRICE_INPUT_PER_MILLION_TOKENS
+            + completion_tokens * openai_settings.OPENAI_PRICE_OUTPUT_PER_MILLION_TOKENS
+        )
+        / 1_000_000
+    )
@@ -0,0 +1,151 @@
+import json
+import re
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+__all__ = [
+    "StoryOutputModel",
+    "StoryOutputParser",
+    "StoryParseError",
+    "STORY_RESPONSE_FORMAT",
+    "REASK_PROMPT",
+    "repair_json",
+    "story_parser",
+]
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+
+
+class StoryOutputModel(BaseModel):
+    """
+    Model output for a story.
+    """
+
+    title: str
+    story: str
+
+
+# Structured output mode: the provider constrains decoding to this schema
+STORY_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "story",
+        "strict": True,
+        "schema": StoryOutputModel.model_json_schema() | {"additionalProperties": False},
+    },
+}
+
+REASK_PROMPT = (
+    "Tu respuesta anterior no era un objeto JSON válido con las claves \"title\" y \"story\". "
+    "Responde de nuevo solo con ese objeto JSON, sin texto adicional."
+)
+
+
+class StoryParseError(ValueError):
+    """
+    Model output that is not a story, even after repair.
+    """
+
+
+def repair_json(text: str) -> str | None:
+    """
+    Cheap fixes for the usual ways model output breaks JSON: code fences, text around
+    the object and truncation (unterminated string, dangling comma or missing braces).
+
+    Returns the candidate object or None if there is no object at all.
+    """
+    text = _FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    text = text[start:]
+    closers: list[str] = []
+    in_string = escape = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]" and closers:
+            closers.pop()
+            if not closers:
+                # Complete object, drop whatever follows it
+                return text[: index + 1]
+
+    # Truncated output: close what was left open
+    if escape:
+        text = text[:-1]
+    if in_string:
+        text += '"'
+
+    text = text.rstrip().rstrip(",")
+    if text.endswith(":"):
+        text += '""'
+
+    return text + "".join(reversed(closers))
+
+
+class StoryOutputParser:
+    """
+    Parse model output into a `StoryOutputModel`, repairing it locally when needed.
+
+    Counters are kept per worker to follow how often outputs need repair or a re-ask.
+    """
+
+    def __init__(self) -> None:
+        self.outputs = 0
+        self.repaired = 0
+        self.invalid = 0
+        self.reasks = 0
+
+    def parse(self, text: str) -> StoryOutputModel:
+        self.outputs += 1
+
+        try:
+            return self._validate(text)
+        except (ValidationError, ValueError):
+            pass
+
+        repaired = repair_json(text)
+        if repaired is not None:
+            try:
+                story = self._validate(repaired)
+            except (ValidationError, ValueError):
+                pass
+            else:
+                self.repaired += 1
+                return story
+
+        self.invalid += 1
+        raise StoryParseError("Model output is not a valid story")
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "outputs": self.outputs,
+            "repaired": self.repaired,
+            "invalid": self.invalid,
+            "reasks": self.reasks,
+            "repair_rate": self.repaired / self.outputs if self.outputs else 0.0,
+            "reask_rate": self.reasks / self.outputs if self.outputs else 0.0,
+        }
+
+    @staticmethod
+    def _validate(text: str) -> StoryOutputModel:
+        story = StoryOutputModel.model_validate(json.loads(text))
+        if not story.title.strip() or not story.story.strip():
+            raise ValueError("Empty title or story")
+
+        return story
+
+
+story_parser = StoryOutputParser()
@@ -0,0 +1,250 @@
+import asyncio
+from collections import deque
+from enum import StrEnum
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable, TypeVar
+
+import openai
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceededError",
+    "LatencyTracker",
+    "ResilientCaller",
+    "is_retryable",
+]
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling upstream while the circuit breaker is open.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Upstream unavailable")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """
+    Raised when a call, retries included, exceeds its deadline.
+    """
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Transient upstream failures: timeouts, connection errors, rate limits and 5xx.
+    """
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds, then lets a single trial call through (half-open): the
+    circuit closes again if it succeeds and reopens if it fails.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == CircuitState.CLOSED:
+            return
+
+        elapsed = monotonic() - self.opened_at
+        if self.state == CircuitState.OPEN and elapsed >= self.reset_timeout:
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+
+        self.rejected += 1
+        raise CircuitOpenError(retry_after=max(1.0, self.reset_timeout - elapsed))
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.trips += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = monotonic()
+
+    def release(self) -> None:
+        """
+        Forget a call that ended without telling anything about upstream health.
+        """
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Latencies of the most recent successful calls.
+    """
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> float:
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, max(0, round(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls with a circuit breaker, jittered exponential backoff on
+    retryable errors, a hard deadline covering every attempt, and optional hedging.
+
+    Hedging starts a second identical call once the first has been running longer than
+    the `hedge_percentile` latency of recent calls, and keeps whichever finishes first.
+    It trades extra upstream usage for a lower tail latency, 0 disables it.
+    """
+
+    def __init__(
+        self,
+        attempts: int,
+        backoff: float,
+        backoff_max: float,
+        deadline: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        hedge_percentile: float = 0,
+        hedge_min_samples: int = 20,
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latencies = LatencyTracker()
+
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.deadlines_exceeded = 0
+
+    async def call(self, func: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        self.calls += 1
+        retrying = AsyncRetrying(
+            retry=retry_if_exception(is_retryable),
+            wait=wait_random_exponential(multiplier=self.backoff, max=self.backoff_max),
+            stop=stop_after_attempt(self.attempts),
+            before_sleep=self._count_retry,
+            reraise=True,
+        )
+
+        try:
+            async with asyncio.timeout(self.deadline):
+                async for attempt in retrying:
+                    with attempt:
+                        return await self._attempt(func, hedge)
+        except TimeoutError:
+            self.deadlines_exceeded += 1
+            self.breaker.record_failure()
+            raise DeadlineExceededError(f"Upstream call exceeded {self.deadline}s") from None
+
+        raise AssertionError("unreachable")
+
+    def stats(self) -> dict[str, int | float | str]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "circuit_state": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "circuit_rejected": self.breaker.rejected,
+        }
+
+    def _count_retry(self, _) -> None:
+        self.retries += 1
+
+    async def _attempt(self, func: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        self.breaker.before_call()
+        start = perf_counter()
+
+        try:
+            if hedge and self.hedge_percentile and len(self.latencies) >= self.hedge_min_samples:
+                result = await self._hedged(func, self.latencies.percentile(self.hedge_percentile))
+            else:
+                result = await func()
+        except BaseException as e:
+            # Cancellation (client gone or deadline hit) says nothing by itself, `call`
+            # records the deadline case
+            if is_retryable(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+        # Only calls that can be hedged feed the hedge delay: a stream "succeeds" as soon
+        # as it opens, its latency would pull the delay down
+        if hedge:
+            self.latencies.add(perf_counter() - start)
+        return result
+
+    async def _hedged(self, func: Callable[[], Awaitable[T]], delay: float) -> T:
+        tasks = {asyncio.ensure_future(func())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(func()))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+            assert error is not None
+            raise error
+
+        finally:
+            for task in tasks:
+                task.cancel()
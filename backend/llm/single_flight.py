@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+__all__ = ["SingleFlight"]
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Merges concurrent calls sharing a key onto a single execution.
+
+    The first caller for a key starts the call, later callers for the same key wait for
+    its result while it is in flight. The call runs in its own task, so a cancelled
+    caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Future[T]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(func())
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self._calls[key] = future
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+        }
+
+    def _forget(self, key: Hashable, future: asyncio.Future[T]) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not future.cancelled():
+            future.exception()
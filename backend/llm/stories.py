@@ -0,0 +1,145 @@
+import logging
+from time import perf_counter
+from dataclasses import dataclass
+from uuid import UUID
+
+from backend.comedians.base import BaseComedian
+from backend.llm.admission import admission
+from backend.llm.cache import get_generation_cache, get_generation_cache_key
+from backend.llm.client import LLMClient
+from backend.llm.metrics import LLM_REQUEST_DURATION, record_llm_usage
+from backend.llm.parsing import REASK_PROMPT, STORY_RESPONSE_FORMAT, StoryParseError, story_parser
+from backend.llm.single_flight import SingleFlight
+from backend.llm.messages import (
+    STORY_MODEL,
+    STORY_MAX_TOKENS,
+    STORY_TEMPERATURE,
+    build_story_messages,
+    estimate_story_tokens,
+)
+
+__all__ = [
+    "GeneratedStory",
+    "generate_story",
+    "get_cached_story",
+    "cache_story",
+    "story_flights",
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GeneratedStory:
+    title: str
+    story: str
+    cached: bool = False
+
+    def as_dict(self) -> dict[str, str]:
+        return {"title": self.title, "story": self.story}
+
+
+story_flights: SingleFlight["GeneratedStory"] = SingleFlight()
+
+
+def get_story_cache_key(comedian: type[BaseComedian], prompt: str) -> str:
+    return get_generation_cache_key(comedian, prompt, STORY_MODEL, STORY_TEMPERATURE)
+
+
+async def get_cached_story(comedian: type[BaseComedian], prompt: str) -> GeneratedStory | None:
+    cache = get_generation_cache()
+    if cache is None:
+        return None
+
+    try:
+        story = await cache.get(get_story_cache_key(comedian, prompt))
+    except Exception:
+        # A cache outage must not fail the generation
+        logger.warning("Generation cache lookup failed", exc_info=True)
+        return None
+
+    return None if story is None else GeneratedStory(**story, cached=True)
+
+
+async def cache_story(comedian: type[BaseComedian], prompt: str, story: GeneratedStory) -> None:
+    cache = get_generation_cache()
+    if cache is None or not story.title or not story.story:
+        return
+
+    try:
+        await cache.set(get_story_cache_key(comedian, prompt), story.as_dict())
+    except Exception:
+        logger.warning("Generation cache write failed", exc_info=True)
+
+
+async def generate_story(
+    client: LLMClient,
+    comedian: type[BaseComedian],
+    prompt: str,
+    user_id: UUID,
+    use_cache: bool = True,
+    user_admitted: bool = False,
+) -> GeneratedStory:
+    """
+    Generate a story narrated by `comedian`, reusing a cached one when allowed.
+    `user_admitted` skips the per user limits, for callers that admitted the user already.
+
+    Raises `AdmissionRejected` when the user or the upstream limits are exhausted, and
+    `StoryParseError` when the output can't be parsed even after repair and one re-ask.
+    """
+    if use_cache and (story := await get_cached_story(comedian, prompt)) is not None:
+        return story
+
+    async def complete(messages: list[dict[str, str]]) -> str:
+        start = perf_counter()
+        outcome = "error"
+        try:
+            response = await client.create_completion(
+                messages,
+                estimate_story_tokens(comedian, prompt),
+                model=STORY_MODEL,
+                max_tokens=STORY_MAX_TOKENS,
+                temperature=STORY_TEMPERATURE,
+                response_format=STORY_RESPONSE_FORMAT,
+            )
+            outcome = "success"
+        finally:
+            LLM_REQUEST_DURATION.labels(comedian.name, "complete", outcome).observe(perf_counter() - start)
+
+        record_llm_usage(comedian.name, response.usage)
+        return response.choices[0].message.content or ""
+
+    async def request_story() -> GeneratedStory:
+        messages = build_story_messages(comedian, prompt)
+        content = await complete(messages)
+
+        try:
+            output = story_parser.parse(content)
+        except StoryParseError:
+            # Local repair wasn't enough, ask once more showing the broken answer
+            logger.warning("Unparseable story output, asking again")
+            story_parser.reasks += 1
+            content = await complete(
+                [*messages, {"role": "assistant", "content": content}, {"role": "user", "content": REASK_PROMPT}]
+            )
+            output = story_parser.parse(content)
+
+        story = GeneratedStory(title=output.title, story=output.story)
+
+        if use_cache:
+            await cache_story(comedian, prompt, story)
+
+        return story
+
+    async def request_shared_story() -> GeneratedStory:
+        # Identical requests in flight share one upstream call, unless a fresh story was asked
+        if not use_cache:
+            return await request_story()
+
+        return await story_flights.do(get_story_cache_key(comedian, prompt), request_story)
+
+    if user_admitted:
+        return await request_shared_story()
+
+    async with admission.admit_user(user_id):
+        return await request_shared_story()
@@ -0,0 +1,158 @@
+import json
+from enum import Enum, auto
+
+ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class _State(Enum):
+    OBJECT = auto()
+    KEY = auto()
+    KEY_ESCAPE = auto()
+    COLON = auto()
+    VALUE = auto()
+    STRING = auto()
+    ESCAPE = auto()
+    UNICODE = auto()
+    SKIP = auto()
+
+
+class StoryStreamParser:
+    """
+    Incremental parser for the `{"title": ..., "story": ...}` object returned by the model.
+
+    Raw chunks are fed as they arrive and the decoded text of the known string fields is
+    returned as soon as it is available, so it can be forwarded before the object is
+    complete. Anything outside the object (e.g. a stray code fence) is ignored.
+    """
+
+    FIELDS = ("title", "story")
+
+    def __init__(self) -> None:
+        self.raw = ""
+        self.values: dict[str, str] = {field: "" for field in self.FIELDS}
+        self._state = _State.OBJECT
+        self._key = ""
+        self._field: str | None = None
+        self._unicode = ""
+        self._high_surrogate: int | None = None
+        self._deltas: list[tuple[str, str]] = []
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """
+        Consume a chunk of raw model output and return the `(field, text)` deltas it produced.
+        """
+        self.raw += chunk
+        self._deltas = []
+
+        for char in chunk:
+            self._consume(char)
+
+        return self._deltas
+
+    def result(self) -> dict[str, str]:
+        """
+        Return the parsed fields, preferring a full JSON decode of the raw output.
+        """
+        try:
+            start, end = self.raw.index("{"), self.raw.rindex("}")
+            decoded = json.loads(self.raw[start : end + 1])
+        except ValueError:
+            decoded = None
+
+        if isinstance(decoded, dict):
+            return {field: str(decoded.get(field) or "") for field in self.FIELDS}
+
+        return dict(self.values)
+
+    def _emit(self, text: str) -> None:
+        if self._field is None:
+            return
+
+        self.values[self._field] += text
+        if self._deltas and self._deltas[-1][0] == self._field:
+            self._deltas[-1] = (self._field, self._deltas[-1][1] + text)
+        else:
+            self._deltas.append((self._field, text))
+
+    def _consume(self, char: str) -> None:
+        match self._state:
+            case _State.OBJECT:
+                if char == '"':
+                    self._key = ""
+                    self._state = _State.KEY
+
+            case _State.KEY:
+                if char == '"':
+                    self._state = _State.COLON
+                elif char == "\\":
+                    self._state = _State.KEY_ESCAPE
+                else:
+                    self._key += char
+
+            case _State.KEY_ESCAPE:
+                self._key += char
+                self._state = _State.KEY
+
+            case _State.COLON:
+                if char == ":":
+                    self._state = _State.VALUE
+
+            case _State.VALUE:
+                if char == '"':
+                    self._field = self._key if self._key in self.values else None
+                    self._state = _State.STRING
+                elif not char.isspace():
+                    self._state = _State.SKIP
+
+            case _State.SKIP:
+                if char == ",":
+                    self._state = _State.OBJECT
+
+            case _State.STRING:
+                if char == '"':
+                    self._field = None
+                    self._state = _State.OBJECT
+                elif char == "\\":
+                    self._state = _State.ESCAPE
+                else:
+                    self._emit(char)
+
+            case _State.ESCAPE:
+                if char == "u":
+                    self._unicode = ""
+                    self._state = _State.UNICODE
+                else:
+                    self._emit(ESCAPES.get(char, char))
+                    self._state = _State.STRING
+
+            case _State.UNICODE:
+                self._unicode += char
+                if len(self._unicode) == 4:
+                    self._emit_codepoint(self._unicode)
+                    self._state = _State.STRING
+
+    def _emit_codepoint(self, digits: str) -> None:
+        try:
+            codepoint = int(digits, 16)
+        except ValueError:
+            self._emit("\\u" + digits)
+            return
+
+        if 0xD800 <= codepoint < 0xDC00:
+            self._high_surrogate = codepoint
+            return
+
+        if 0xDC00 <= codepoint < 0xE000 and self._high_surrogate is not None:
+            codepoint = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (codepoint - 0xDC00)
+
+        self._high_surrogate = None
+        self._emit(chr(codepoint))
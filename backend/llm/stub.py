@@ -0,0 +1,298 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Used for development, benchmarks and failure testing: point `OPENAI_BASE_URL` at
+`http://<host>:<port>/v1` and run `python -m backend app llm-stub`.
+
+Faults can be injected at startup or changed while running through `PUT /stub/faults`:
+a share of calls fail with `failure_status`, a share are answered only after
+`slow_latency` seconds (long enough to hit client timeouts or trigger hedging), a
+share return malformed output (fenced and truncated JSON) and a share of streams are
+cut after their first chunk.
+
+The files and batches endpoints of the Batch API are stubbed too. Batches are kept in
+memory and complete after `latency` seconds per 100 requests, with failures injected
+per request.
+"""
+
+import asyncio
+import json
+import random
+import time
+from email.parser import BytesParser
+from email.policy import default
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+
+class StubFaultsModel(BaseModel):
+    failure_rate: float = Field(0, ge=0, le=1)
+    failure_status: int = 500
+    slow_rate: float = Field(0, ge=0, le=1)
+    slow_latency: float = 30.0
+    malformed_rate: float = Field(0, ge=0, le=1)
+    stream_cut_rate: float = Field(0, ge=0, le=1)
+
+
+def stub_story(messages: list[dict[str, Any]]) -> str:
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+
+    return json.dumps(
+        {
+            "title": "Historia de prueba",
+            "story": f"Érase una vez una historia generada por el stub: {prompt[-200:].strip()}",
+        },
+        ensure_ascii=False,
+    )
+
+
+def stub_completion(
+    completion_id: str,
+    created: int,
+    model: str,
+    messages: list[dict[str, Any]],
+    content: str,
+) -> dict[str, Any]:
+    prompt_tokens = sum(len(str(message.get("content", ""))) // 4 for message in messages)
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        },
+    }
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict[str, tuple[str | None, bytes]]:
+    """
+    Fields of a multipart/form-data body as `{name: (filename, content)}`.
+    """
+    message = BytesParser(policy=default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+
+    return {
+        part.get_param("name", header="content-disposition"): (
+            part.get_filename(),
+            part.get_payload(decode=True) or b"",
+        )
+        for part in message.iter_parts()
+    }
+
+
+def create_stub_app(
+    latency: float = 0.5,
+    chunk_size: int = 16,
+    chunk_delay: float = 0.01,
+    faults: StubFaultsModel | None = None,
+    seed: int | None = None,
+) -> FastAPI:
+    """
+    Create the stub application.
+
+    `latency` is the delay before the first byte of a completion, `chunk_delay` the delay
+    between streamed chunks of `chunk_size` characters. `seed` makes fault injection
+    reproducible.
+    """
+    app = FastAPI(title="Sorna LLM stub")
+    app.state.faults = faults or StubFaultsModel()
+    rng = random.Random(seed)
+
+    @app.get("/stub/faults")
+    async def get_faults() -> StubFaultsModel:
+        return app.state.faults
+
+    @app.put("/stub/faults")
+    async def set_faults(faults: StubFaultsModel) -> StubFaultsModel:
+        app.state.faults = faults
+        return faults
+
+    files: dict[str, dict[str, Any]] = {}
+    file_contents: dict[str, bytes] = {}
+    batches: dict[str, dict[str, Any]] = {}
+    batch_tasks: set[asyncio.Task] = set()
+
+    def store_file(filename: str, purpose: str, content: bytes) -> dict[str, Any]:
+        file = {
+            "id": f"file-{uuid4().hex}",
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        files[file["id"]] = file
+        file_contents[file["id"]] = content
+        return file
+
+    async def run_batch(batch: dict[str, Any]) -> None:
+        requests = [json.loads(line) for line in file_contents[batch["input_file_id"]].splitlines() if line.strip()]
+        batch["request_counts"]["total"] = len(requests)
+        await asyncio.sleep(latency * (1 + len(requests) // 100))
+
+        output, errors = [], []
+        for request in requests:
+            faults: StubFaultsModel = app.state.faults
+            line: dict[str, Any] = {"id": f"batch_req_{uuid4().hex}", "custom_id": request["custom_id"], "error": None}
+
+            if rng.random() < faults.failure_rate:
+                line["response"] = {
+                    "status_code": faults.failure_status,
+                    "request_id": uuid4().hex,
+                    "body": {"error": {"message": "Injected failure", "type": "stub_error"}},
+                }
+                errors.append(line)
+                batch["request_counts"]["failed"] += 1
+                continue
+
+            messages = request["body"].get("messages", [])
+            line["response"] = {
+                "status_code": 200,
+                "request_id": uuid4().hex,
+                "body": stub_completion(
+                    f"chatcmpl-{uuid4().hex}",
+                    int(time.time()),
+                    request["body"].get("model", "stub"),
+                    messages,
+                    stub_story(messages),
+                ),
+            }
+            output.append(line)
+            batch["request_counts"]["completed"] += 1
+
+        for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                content = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines).encode("utf-8")
+                batch[key] = store_file(f"{batch['id']}_{key}.jsonl", "batch_output", content)["id"]
+
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+    @app.post("/v1/files")
+    async def create_file(request: Request):
+        fields = parse_multipart(request.headers.get("content-type", ""), await request.body())
+        filename, content = fields.get("file", (None, b""))
+        purpose = fields.get("purpose", (None, b""))[1].decode("utf-8")
+        return store_file(filename or "upload.jsonl", purpose, content)
+
+    @app.get("/v1/files/{file_id}/content")
+    async def get_file_content(file_id: str):
+        if file_id not in file_contents:
+            raise HTTPException(status_code=404, detail="File not found")
+        return Response(file_contents[file_id], media_type="application/octet-stream")
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        if body.get("input_file_id") not in files:
+            raise HTTPException(status_code=400, detail="Input file not found")
+
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid4().hex}",
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "errors": None,
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": now,
+            "in_progress_at": now,
+            "expires_at": now + 86400,
+            "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get("metadata"),
+        }
+        batches[batch["id"]] = batch
+        task = asyncio.create_task(run_batch(batch))
+        batch_tasks.add(task)
+        task.add_done_callback(batch_tasks.discard)
+        return batch
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return batches[batch_id]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        content = stub_story(body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        created = int(time.time())
+        faults: StubFaultsModel = app.state.faults
+
+        if rng.random() < faults.malformed_rate:
+            content = f"```json\n{content[: len(content) * 3 // 4]}"
+
+        if rng.random() < faults.failure_rate:
+            await asyncio.sleep(latency / 10)
+            return JSONResponse(
+                status_code=faults.failure_status,
+                content={"error": {"message": "Injected failure", "type": "stub_error", "code": None}},
+            )
+
+        await asyncio.sleep(faults.slow_latency if rng.random() < faults.slow_rate else latency)
+
+        if not body.get("stream"):
+            return JSONResponse(stub_completion(completion_id, created, model, body.get("messages", []), content))
+
+        cut = rng.random() < faults.stream_cut_rate
+
+        async def chunks() -> AsyncIterator[str]:
+            for start in range(0, len(content), chunk_size):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": content[start : start + chunk_size]},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if cut:
+                    return  # Connection dropped: no more chunks, no [DONE]
+                await asyncio.sleep(chunk_delay)
+
+            if (body.get("stream_options") or {}).get("include_usage"):
+                completion = stub_completion(completion_id, created, model, body.get("messages", []), content)
+                usage_chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": completion["usage"],
+                }
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
@@ -0,0 +1,48 @@
+import logging
+from functools import cache
+from typing import Any
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+__all__ = ["count_tokens", "load_token_encoding", "TOKEN_ENCODING"]
+
+logger = logging.getLogger(__name__)
+
+# Encoding of the gpt-4o family
+TOKEN_ENCODING = "o200k_base"
+
+
+@cache
+def _get_encoding() -> Any | None:
+    if tiktoken is None:
+        return None
+
+    try:
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception:
+        # The encoding is downloaded on first use, it may be unreachable
+        logger.warning("Could not load the %s encoding, estimating tokens", TOKEN_ENCODING, exc_info=True)
+        return None
+
+
+def load_token_encoding() -> bool:
+    """
+    Load the encoding ahead of the first count, which may download it. Blocking: call it
+    from a thread at worker startup. Returns whether counts will be exact.
+    """
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens of `text`. Exact when `tiktoken` is installed, otherwise an
+    estimate of 4 characters per token.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+
+    return len(encoding.encode(text, disallowed_special=()))
@@ -14,4 +14,15 @@ class DatabaseSettings(BaseSettings):
     DATABASE_PASSWORD: str = "postgres"
     DATABASE_NAME: str = "backend"
     DATABASE_MANAGEMENT_NAME: str = "postgres"
-    
+
+    # Connection pool (one pool per worker process)
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30.0
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800 # 30 minutes
+    DATABASE_POOL_PRE_PING: bool = True
+
+    # Write-behind buffer grouping story inserts into multi-row statements
+    DATABASE_WRITE_BEHIND_DELAY_SECONDS: float = 0.005 # Time a batch waits for more rows
+    DATABASE_WRITE_BEHIND_MAX_BATCH: int = 100
+    DATABASE_WRITE_BEHIND_MAX_PENDING: int = 1000 # Callers wait when the queue is full
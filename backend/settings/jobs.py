@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class JobsSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    JOBS_CONCURRENCY: int = 4 # Jobs processed at once by each worker process
+    JOBS_POLL_INTERVAL_SECONDS: float = 1.0
+    JOBS_LEASE_SECONDS: int = 300 # A running job not finished within the lease is retried
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_EVENTS_MAX_SECONDS: float = 300.0 # A job events stream ends after that long, clients reconnect
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,4 +10,46 @@ class OpenaiSettings(BaseSettings):
     extra="ignore",
     )
         
-    OPENAI_API_KEY: str = ""
\ No newline at end of file
+    OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str | None = None # Point to a local stub in development/benchmarks
+
+    # Shared HTTP connection pool
+    OPENAI_HTTP2: bool = True
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # Per call limits
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_MAX_RETRIES: int = 0 # SDK level retries, the resilience policy below retries instead
+    OPENAI_MAX_CONCURRENCY: int = 32 # Upstream calls in flight per worker, retries and hedges included
+    OPENAI_PROMPT_MAX_TOKENS: int = 1000 # Budget of the user prompt, comedian templates excluded
+
+    # Generated stories cache (opt-in): "none", "memory" (per worker) or "postgres" (shared)
+    OPENAI_CACHE_BACKEND: Literal["none", "memory", "postgres"] = "none"
+    OPENAI_CACHE_TTL_SECONDS: float = 86400.0 # 1 day
+    OPENAI_CACHE_MAX_ENTRIES: int = 10000
+
+    # Admission control, sized after the provider rate limits. Callers wait up to the
+    # max wait for a slot, then get a 429.
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 300000
+    OPENAI_USER_MAX_CONCURRENCY: int = 2
+    OPENAI_USER_REQUESTS_PER_MINUTE: int = 10
+    OPENAI_ADMISSION_MAX_WAIT_SECONDS: float = 10.0
+
+    # Resilience policy around each call: jittered exponential backoff on retryable
+    # errors, a deadline covering every attempt and a circuit breaker
+    OPENAI_RETRY_ATTEMPTS: int = 3
+    OPENAI_RETRY_BACKOFF_SECONDS: float = 0.5
+    OPENAI_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    OPENAI_DEADLINE_SECONDS: float = 90.0
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = 5 # Consecutive failures before failing fast
+    OPENAI_CIRCUIT_RESET_SECONDS: float = 30.0
+    OPENAI_HEDGE_PERCENTILE: float = 0 # Latency percentile after which a duplicate call is sent, 0 disables
+    OPENAI_HEDGE_MIN_SAMPLES: int = 20
+
+    # Prices used to estimate the cost in /metrics (USD per million tokens)
+    OPENAI_PRICE_INPUT_PER_MILLION_TOKENS: float = 2.5
+    OPENAI_PRICE_OUTPUT_PER_MILLION_TOKENS: float = 10.0
@@ -1,5 +1,6 @@
 from hashlib import blake2b
 from platform import uname
+from pydantic import PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 DEFAULT_SECRET = blake2b(
@@ -19,3 +20,44 @@ class WebSettings(BaseSettings):
     WEB_FQDN: str = "localhost"
     WEB_COOKIE_EXPIRATION_SECONDS: int = 14400 # 4 hours
     WEB_COOKIE_EXTEND_TRIGGER_SECONDS: int = 600 # 10 minutes
+
+    # In-process cache of validated sessions (per worker). A revoked session can still be
+    # accepted by other workers for up to the TTL. Set the TTL to 0 to disable.
+    WEB_SESSION_CACHE_SIZE: int = 10000
+    WEB_SESSION_CACHE_TTL_SECONDS: float = 30.0
+    WEB_SESSION_CACHE_NEGATIVE_TTL_SECONDS: float = 5.0
+
+    # Password hashing (bcrypt). Changing the rounds rehashes passwords on next login.
+    WEB_BCRYPT_ROUNDS: int = 12
+    WEB_PASSWORD_HASH_WORKERS: int = 4
+    WEB_PASSWORD_HASH_MAX_PENDING: int = 64 # Queued + running, above that requests get a 429
+
+    # Expired sessions reaper, run by every worker (0 disables it)
+    WEB_SESSION_REAPER_INTERVAL_SECONDS: float = 300.0 # 5 minutes
+    WEB_SESSION_REAPER_BATCH_SIZE: PositiveInt = 1000 # Rows deleted per statement
+
+    # Metrics
+    WEB_EVENT_LOOP_LAG_INTERVAL_SECONDS: float = 0.5 # Event loop lag sampling, 0 disables it
+    # Bearer token of the internal endpoints (/metrics, /monitoring), empty hides them (404)
+    WEB_MONITORING_TOKEN: str = ""
+
+    # Diagnostics mode: logs the stack of anything blocking the event loop longer than
+    # the threshold and profiles requests sent with the X-Sorna-Profile header set to the
+    # token (empty token disables profiling). Off by default, costs nothing when off.
+    WEB_DIAGNOSTICS: bool = False
+    WEB_DIAGNOSTICS_BLOCK_THRESHOLD_SECONDS: float = 0.1
+    WEB_DIAGNOSTICS_PROFILE_TOKEN: str = ""
+    WEB_DIAGNOSTICS_PROFILE_DIR: str = "profiles"
+    WEB_DIAGNOSTICS_PROFILE_INTERVAL_SECONDS: float = 0.005
+
+    # Production server (`sorna app serve`): gunicorn with uvicorn workers
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0 # 0 sizes the pool from the CPUs available to the process
+    WEB_PRELOAD: bool = True # Import the app once in the master, workers fork from it
+    WEB_MAX_REQUESTS: int = 10000 # Recycle a worker after that many requests, 0 disables it
+    WEB_MAX_REQUESTS_JITTER: int = 1000 # Spread recycling so workers don't restart together
+    WEB_KEEPALIVE_SECONDS: int = 5 # Keep above the idle timeout of the proxy in front
+    WEB_TIMEOUT_SECONDS: int = 60 # Silent workers are killed and restarted
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30 # In-flight requests allowed to finish on restart
+    WEB_BACKLOG: int = 2048
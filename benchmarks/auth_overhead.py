@@ -0,0 +1,78 @@
+"""
+Micro-benchmark of the per-request cookie/JWT work done by the auth layer.
+
+Compares the previous flow (verify both cookies in the middleware, then re-parse them
+with `jwt.get_unverified_claims` in `validate`) against the current one (verify once and
+reuse the claims). Database access is excluded.
+
+    python -m benchmarks.auth_overhead --number 5000
+"""
+
+import argparse
+import timeit
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+from jose import jwt
+
+from backend.api.security import SessionMiddleware, web_settings
+
+
+def make_cookies() -> tuple[str, str]:
+    user_id = str(uuid4())
+    exp = int((datetime.now(UTC) + timedelta(hours=4)).timestamp())
+    session = SessionMiddleware.create_session_cookie(
+        {"user_id": user_id, "session": "x" * 44, "exp": exp}
+    )
+    profile = SessionMiddleware.create_profile_cookie(
+        {"user_id": user_id, "username": "bench", "email": "bench@example.com", "exp": exp}
+    )
+    return session["value"], profile["value"]
+
+
+def legacy_auth(session: str, profile: str) -> None:
+    for token in (session, profile):
+        claims = jwt.decode(
+            token,
+            web_settings.WEB_COOKIE_SECRET,
+            algorithms=["HS256"],
+            options={"verify_signature": True, "verify_exp": True},
+        )
+        SessionMiddleware.extend_cookie(claims)
+
+    session_raw = jwt.get_unverified_claims(session)
+    profile_raw = jwt.get_unverified_claims(profile)
+    UUID(session_raw["user_id"])
+    UUID(profile_raw["user_id"])
+
+
+def current_auth(session: str, profile: str) -> None:
+    now = datetime.now(UTC)
+    session_claims = SessionMiddleware.decode_cookie(session, SessionMiddleware.SESSION_CLAIMS)
+    profile_claims = SessionMiddleware.decode_cookie(profile, SessionMiddleware.PROFILE_CLAIMS)
+    SessionMiddleware.extend_cookie(session_claims, now)
+    SessionMiddleware.extend_cookie(profile_claims, now)
+    UUID(session_claims["user_id"])
+    UUID(profile_claims["user_id"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=5000, help="Requests per repetition.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    session, profile = make_cookies()
+    results = {}
+    for name, func in (("legacy", legacy_auth), ("current", current_auth)):
+        timings = timeit.repeat(
+            lambda: func(session, profile), number=args.number, repeat=args.repeat
+        )
+        results[name] = min(timings) / args.number * 1e6
+        print(f"{name:>8}: {results[name]:8.1f} us/request")
+
+    print(f" speedup: {results['legacy'] / results['current']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
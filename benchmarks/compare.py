@@ -0,0 +1,42 @@
+"""
+Compare two reports of `benchmarks.load`.
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors")
+
+
+def format_change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before:+.1%}"
+
+
+def main(args: argparse.Namespace) -> None:
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+
+    print(f"before: {before['commit']}  after: {after['commit']}")
+    if before["parameters"] != after["parameters"]:
+        print("warning: the reports were run with different parameters")
+
+    for scenario, results in after["scenarios"].items():
+        if scenario not in before["scenarios"]:
+            continue
+
+        print(f"\n{scenario}")
+        for metric in METRICS:
+            old, new = before["scenarios"][scenario][metric], results[metric]
+            print(f"  {metric:<15}{old:>12.2f}{new:>12.2f}{format_change(old, new):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    main(parser.parse_args())
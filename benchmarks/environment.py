@@ -0,0 +1,135 @@
+"""
+Disposable dependencies for the benchmarks: a Postgres cluster created with `initdb`
+in a temporary directory, and the LLM stub served from a background thread.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def find_postgres_binary(name: str) -> str:
+    """
+    Look for a Postgres binary in PATH, then in the usual versioned install directories.
+    """
+    if path := shutil.which(name):
+        return path
+
+    for candidate in sorted(Path("/usr/lib/postgresql").glob(f"*/bin/{name}"), reverse=True):
+        return str(candidate)
+
+    raise RuntimeError(f"{name} not found, install Postgres or use --database env")
+
+
+@contextmanager
+def ephemeral_postgres() -> Iterator[dict[str, str]]:
+    """
+    Run a throwaway Postgres cluster and yield the `DATABASE_*` settings pointing at it.
+
+    The cluster runs with fsync off: numbers are comparable between commits, not with a
+    production server.
+    """
+    initdb = find_postgres_binary("initdb")
+    pg_ctl = find_postgres_binary("pg_ctl")
+
+    directory = Path(tempfile.mkdtemp(prefix="sorna-bench-"))
+    data = directory / "data"
+    port = get_free_port()
+
+    subprocess.run(
+        [initdb, "-D", str(data), "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    subprocess.run(
+        [
+            pg_ctl,
+            "-D", str(data),
+            "-l", str(directory / "postgres.log"),
+            "-o", f"-p {port} -k {directory} -c listen_addresses=127.0.0.1 -c fsync=off -c max_connections=200",
+            "-w",
+            "start",
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        yield {
+            "DATABASE_HOST": "127.0.0.1",
+            "DATABASE_PORT": str(port),
+            "DATABASE_USER": "postgres",
+            "DATABASE_PASSWORD": "postgres",
+            "DATABASE_NAME": "backend",
+        }
+    finally:
+        subprocess.run([pg_ctl, "-D", str(data), "-m", "fast", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def llm_stub(latency: float, chunk_delay: float) -> Iterator[str]:
+    """
+    Serve the LLM stub on a free port and yield its OpenAI base URL.
+    """
+    import uvicorn
+
+    from backend.llm.stub import create_stub_app
+
+    port = get_free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_stub_app(latency=latency, chunk_delay=chunk_delay),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    thread = threading.Thread(target=server.run, name="llm-stub", daemon=True)
+    thread.start()
+
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("LLM stub failed to start")
+        time.sleep(0.05)
+
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def setup_database() -> None:
+    """
+    Create the configured database and migrate it to the latest revision.
+    """
+    import asyncio
+
+    from alembic import command
+    from alembic.config import Config
+
+    from backend.database.functions import create_database
+
+    asyncio.run(create_database())
+    command.upgrade(Config(str(Path(__file__).parent.parent / "alembic.ini")), "head")
+
+
+def apply_environment(values: dict[str, str]) -> None:
+    """
+    Settings are read when the backend modules are imported, call this before.
+    """
+    os.environ.update(values)
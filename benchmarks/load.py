@@ -0,0 +1,276 @@
+"""
+Load benchmark suite of the main user flows.
+
+Starts the LLM stub with a configurable latency and the application in-process (with its
+lifespan), against the database configured in `.env` or a disposable Postgres cluster
+(`--database ephemeral`, requires the Postgres binaries). Drives login, `/user_profile`,
+`/stories/history/page` and `/stories/generate` at a fixed concurrency and writes
+throughput and latency percentiles to a JSON report. Run it on two commits and diff the reports:
+
+    python -m benchmarks.load --database ephemeral --output before.json
+    python -m benchmarks.load --database ephemeral --output after.json
+    python -m benchmarks.compare before.json after.json
+
+`--session-middleware legacy` mounts the `BaseHTTPMiddleware` implementation of the session
+middleware that predates the pure ASGI one, so both can be compared on the same commit:
+
+    python -m benchmarks.load --database ephemeral --scenarios user_profile \
+        --session-middleware legacy --output before.json
+    python -m benchmarks.load --database ephemeral --scenarios user_profile --output after.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+from contextlib import ExitStack
+from datetime import UTC, datetime, timezone
+from http.cookies import SimpleCookie
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable
+
+import httpx
+from fastapi import FastAPI
+from jose.exceptions import JWTError
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request as StarletteRequest
+from starlette.responses import Response
+
+from .environment import apply_environment, ephemeral_postgres, llm_stub, setup_database
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark-password"
+EMAIL = "benchmark@example.com"
+
+PROMPT = "Un viaje en tren que no llega nunca a su destino."
+COMEDIAN = "chiquito_de_la_calzada"
+
+SCENARIOS = ("login", "user_profile", "generate", "history")
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def get_session_cookie(response: httpx.Response) -> str:
+    # Cookies are issued for WEB_FQDN, send them explicitly whatever the target host is
+    cookies = SimpleCookie()
+    for header in response.headers.get_list("set-cookie"):
+        cookies.load(header)
+    return "; ".join(f"{key}={morsel.value}" for key, morsel in cookies.items())
+
+
+class LegacySessionMiddleware(BaseHTTPMiddleware):
+    """
+    Session middleware as it was before the pure ASGI rewrite: the same cookie checks run
+    in `dispatch`, and `call_next` wraps every response in a task and a memory stream.
+    """
+
+    async def dispatch(self, request: StarletteRequest, call_next) -> Response:
+        from backend.api.security import SessionMiddleware as Session
+        from backend.api.security import profile_cookie_scheme, session_cookie_scheme
+
+        cookies = []
+        request.state.session_claims = None
+        request.state.profile_claims = None
+
+        session_cookie_encoded = request.cookies.get(session_cookie_scheme.model.name)
+        profile_cookie_encoded = request.cookies.get(profile_cookie_scheme.model.name)
+
+        if session_cookie_encoded and profile_cookie_encoded:
+            try:
+                session_decoded = Session.decode_cookie(session_cookie_encoded, Session.SESSION_CLAIMS)
+                profile_decoded = Session.decode_cookie(profile_cookie_encoded, Session.PROFILE_CLAIMS)
+            except JWTError:
+                session_decoded = profile_decoded = None
+
+            if session_decoded is not None and profile_decoded is not None:
+                request.state.session_claims = session_decoded
+                request.state.profile_claims = profile_decoded
+
+                now = datetime.now(UTC)
+
+                session_cookie_extended = Session.extend_cookie(session_decoded, now)
+                if session_cookie_extended is not None and await Session.extend_session(
+                    session_decoded, session_cookie_extended["exp"]
+                ):
+                    cookies.append(Session.create_session_cookie(session_cookie_extended))
+
+                profile_cookie_extended = Session.extend_cookie(profile_decoded, now)
+                if profile_cookie_extended is not None:
+                    cookies.append(Session.create_profile_cookie(profile_cookie_extended))
+
+        response: Response = await call_next(request)
+        for cookie in cookies:
+            response.set_cookie(**cookie)
+
+        return response
+
+
+def use_legacy_session_middleware(app: FastAPI) -> None:
+    from backend.api.security import SessionMiddleware
+
+    # The middleware stack is built on the first request, swapping the entry is enough
+    app.user_middleware = [
+        Middleware(LegacySessionMiddleware) if middleware.cls is SessionMiddleware else middleware
+        for middleware in app.user_middleware
+    ]
+
+
+async def login(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post("/auth/login", json={"username": USERNAME, "password": PASSWORD})
+
+
+async def get_user_profile(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get("/user_profile")
+
+
+async def generate_story(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post(
+        "/stories/generate",
+        json={"prompt": PROMPT, "comedian": COMEDIAN, "cache": False},
+    )
+
+
+async def get_story_history(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get("/stories/history/page", params={"limit": 20})
+
+
+REQUESTS: dict[str, Request] = {
+    "login": login,
+    "user_profile": get_user_profile,
+    "generate": generate_story,
+    "history": get_story_history,
+}
+
+
+async def authenticate(client: httpx.AsyncClient) -> None:
+    await client.post(
+        "/auth/register",
+        json={"username": USERNAME, "password": PASSWORD, "email": EMAIL},
+    )
+    response = await login(client)
+    response.raise_for_status()
+    client.headers["cookie"] = get_session_cookie(response)
+
+
+async def run(client: httpx.AsyncClient, request: Request, requests: int, concurrency: int) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = perf_counter()
+            response = await request(client)
+            latencies.append(perf_counter() - start)
+            if not response.is_success:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    from backend.api import app
+
+    if args.session_middleware == "legacy":
+        use_legacy_session_middleware(app)
+
+    results: dict[str, dict[str, float]] = {}
+
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="https://localhost", timeout=None) as client,
+    ):
+        await authenticate(client)
+
+        for scenario in args.scenarios:
+            request = REQUESTS[scenario]
+            # Story generation is bounded by the stub latency, keep its run short
+            requests = args.generate_requests if scenario == "generate" else args.requests
+
+            await run(client, request, min(requests, args.warmup), args.concurrency)
+            results[scenario] = await run(client, request, requests, args.concurrency)
+
+    return results
+
+
+def get_git_commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main(args: argparse.Namespace) -> None:
+    with ExitStack() as stack:
+        if args.database == "ephemeral":
+            apply_environment(stack.enter_context(ephemeral_postgres()))
+
+        base_url = stack.enter_context(llm_stub(args.llm_latency, args.llm_chunk_delay))
+        apply_environment(
+            {
+                "OPENAI_API_KEY": "benchmark",
+                "OPENAI_BASE_URL": base_url,
+                "OPENAI_CACHE_BACKEND": "none",
+                # The per-user limits would turn most of the generation run into 429
+                "OPENAI_USER_MAX_CONCURRENCY": str(args.concurrency),
+                "OPENAI_USER_REQUESTS_PER_MINUTE": "1000000",
+            }
+        )
+
+        if args.database == "ephemeral":
+            setup_database()
+
+        results = asyncio.run(run_suite(args))
+
+    report = {
+        "commit": get_git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "database": args.database,
+            "requests": args.requests,
+            "generate_requests": args.generate_requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "llm_latency": args.llm_latency,
+            "llm_chunk_delay": args.llm_chunk_delay,
+            "session_middleware": args.session_middleware,
+        },
+        "scenarios": results,
+    }
+
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database", choices=("env", "ephemeral"), default="env", help="Database configured in .env or a disposable cluster.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--generate-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=100, help="Requests per scenario before measuring.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM latency in seconds.")
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.0)
+    parser.add_argument("--session-middleware", choices=("asgi", "legacy"), default="asgi", help="Session middleware to mount.")
+    parser.add_argument("--output", default="benchmark.json")
+    main(parser.parse_args())
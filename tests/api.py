@@ -0,0 +1,47 @@
+"""
+Helpers to drive the API in tests.
+"""
+
+from http.cookies import SimpleCookie
+from uuid import UUID, uuid4
+
+import httpx
+
+PASSWORD = "test-password"
+
+
+def new_username() -> str:
+    return f"user-{uuid4().hex[:12]}"
+
+
+async def register(client: httpx.AsyncClient, username: str) -> httpx.Response:
+    return await client.post(
+        "/auth/register",
+        json={"username": username, "password": PASSWORD, "email": f"{username}@example.com"},
+    )
+
+
+async def login(client: httpx.AsyncClient, username: str) -> UUID:
+    """
+    Log in and send the session cookies with the next requests. Returns the user id.
+    """
+    response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+
+    # Cookies are issued for WEB_FQDN and secure, send them explicitly
+    cookies = SimpleCookie()
+    for header in response.headers.get_list("set-cookie"):
+        cookies.load(header)
+    client.headers["cookie"] = "; ".join(f"{key}={morsel.value}" for key, morsel in cookies.items())
+
+    # Validate the session once so later requests hit the session cache
+    profile = await client.get("/user_profile")
+    profile.raise_for_status()
+    return UUID(profile.json()["id"])
+
+
+async def create_user(client: httpx.AsyncClient) -> str:
+    username = new_username()
+    (await register(client, username)).raise_for_status()
+    await login(client, username)
+    return username
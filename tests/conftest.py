@@ -0,0 +1,96 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+# Settings are read when the backend modules are imported: point the tests at their own
+# database and keep password hashing cheap before anything imports them.
+os.environ["DATABASE_NAME"] = os.environ.get("TEST_DATABASE_NAME", "backend_test")
+os.environ.setdefault("WEB_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(database):
+    """
+    The shared engine, with a fresh pool per test: asyncpg connections are bound to the
+    event loop of the test.
+    """
+    from backend.database.functions import dispose_engine, init_engine
+
+    yield init_engine()
+    await dispose_engine()
+
+
+@pytest.fixture
+async def client():
+    """
+    Client of the application. The lifespan isn't run: its background tasks would query
+    the database while the tests do.
+    """
+    import httpx
+
+    from backend.api import app
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app),
+        base_url="https://localhost",
+    ) as client:
+        yield client
+
+
+async def postgres_available() -> bool:
+    import asyncpg
+
+    from backend.settings.database import DatabaseSettings
+
+    settings = DatabaseSettings()
+    try:
+        connection = await asyncpg.connect(
+            host=settings.DATABASE_HOST,
+            port=settings.DATABASE_PORT,
+            user=settings.DATABASE_USER,
+            password=settings.DATABASE_PASSWORD,
+            database=settings.DATABASE_MANAGEMENT_NAME,
+            timeout=2,
+        )
+    except (OSError, asyncpg.PostgresError, TimeoutError):
+        return False
+
+    await connection.close()
+    return True
+
+
+@pytest.fixture(scope="session")
+def database():
+    """
+    Create the test database from the migrations, and drop it at the end of the session.
+    Skips the tests using it when the configured Postgres server isn't reachable.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    from backend.database.functions import create_database, drop_database
+
+    if not asyncio.run(postgres_available()):
+        pytest.skip("Postgres not reachable with the DATABASE_* settings")
+
+    async def recreate() -> None:
+        try:
+            await drop_database()
+        except Exception:
+            pass  # Not created yet
+        await create_database()
+
+    asyncio.run(recreate())
+    command.upgrade(Config(str(Path(__file__).parent.parent / "alembic.ini")), "head")
+
+    yield
+
+    asyncio.run(drop_database())
@@ -0,0 +1,81 @@
+from uuid import uuid4
+
+import pytest
+
+from backend.llm.admission import AdmissionController, AdmissionRejected
+
+pytestmark = pytest.mark.anyio
+
+
+def create_admission(**values) -> AdmissionController:
+    return AdmissionController(
+        **{
+            "max_concurrency": 1,
+            "requests_per_minute": 60,
+            "tokens_per_minute": 10_000,
+            "user_max_concurrency": 1,
+            "user_requests_per_minute": 60,
+            "max_wait": 0.1,
+            **values,
+        }
+    )
+
+
+async def test_rejected_calls_keep_the_rate_budget():
+    admission = create_admission()
+
+    async with admission.admit_upstream(100):
+        requests, tokens = admission._requests.tokens, admission._tokens.tokens
+
+        with pytest.raises(AdmissionRejected) as error:
+            async with admission.admit_upstream(100):
+                pass
+
+    assert error.value.reason == "upstream concurrency limit"
+    assert admission._requests.tokens == pytest.approx(requests, abs=0.1)
+    assert admission._tokens.tokens == pytest.approx(tokens, abs=1)
+
+
+async def test_rate_rejection_releases_the_slot():
+    admission = create_admission(requests_per_minute=1)
+
+    async with admission.admit_upstream(100):
+        pass
+
+    with pytest.raises(AdmissionRejected) as error:
+        async with admission.admit_upstream(100):
+            pass
+
+    assert error.value.reason == "upstream rate limit"
+    assert not admission._semaphore.locked()
+
+
+async def test_user_quota_in_use_survives_expiry():
+    admission = create_admission()
+    user_id = uuid4()
+
+    async with admission.admit_user(user_id):
+        admission._users.clear()  # Idle quotas expired meanwhile
+
+        with pytest.raises(AdmissionRejected) as error:
+            async with admission.admit_user(user_id):
+                pass
+
+    assert error.value.reason == "user concurrency limit"
+    assert len(admission._users) == 1
+
+
+async def test_user_batch_holds_the_free_slots():
+    admission = create_admission(user_max_concurrency=3)
+    user_id = uuid4()
+
+    async with admission.admit_user(user_id):
+        async with admission.admit_user(user_id, requests=5, concurrency=5) as slots:
+            assert slots == 2
+
+            with pytest.raises(AdmissionRejected):
+                async with admission.admit_user(user_id):
+                    pass
+
+    async with admission.admit_user(user_id, concurrency=2) as slots:
+        assert slots == 2
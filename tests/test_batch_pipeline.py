@@ -0,0 +1,94 @@
+"""
+Offline generation through the Batch API, driven against the local stub.
+"""
+
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+from backend.comedians.base import MetaComedian
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.functions import get_db_session
+from backend.database.tables import UserPromptsTable, UsersTable
+from backend.jobs.batch import (
+    build_batch_file,
+    copy_stories,
+    read_batch_results,
+    submit_batch,
+    wait_for_batch,
+)
+from backend.llm.client import LLMClient
+from backend.llm.stub import StubFaultsModel, create_stub_app
+from backend.settings.openai import OpenaiSettings
+
+pytestmark = pytest.mark.anyio
+
+PROMPT = "Un viaje en tren"
+COMEDIANS = [MetaComedian.get_comedian(name) for name in ComedianStrEnum]
+
+
+def create_client(faults: StubFaultsModel) -> LLMClient:
+    stub = create_stub_app(latency=0, chunk_delay=0, faults=faults, seed=0)
+    settings = OpenaiSettings(OPENAI_API_KEY="test", OPENAI_BASE_URL="http://stub/v1")
+    return LLMClient(settings, transport=httpx.ASGITransport(stub))
+
+
+async def run_batch(client: LLMClient, user_ids: list):
+    content = build_batch_file(user_ids, COMEDIANS, PROMPT)
+    batch = await submit_batch(client, content, metadata={"prompt": PROMPT})
+    batch = await wait_for_batch(client, batch.id, poll_interval=0.01)
+    return batch, await read_batch_results(client, batch)
+
+
+async def test_batch_round_trip():
+    user_ids = [uuid4(), uuid4()]
+
+    batch, results = await run_batch(create_client(StubFaultsModel()), user_ids)
+
+    assert batch.status == "completed"
+    assert batch.request_counts.total == len(user_ids) * len(COMEDIANS)
+    assert results.failed == 0
+    assert {(record[1], record[4]) for record in results.records} == {
+        (user_id, comedian.name.name) for user_id in user_ids for comedian in COMEDIANS
+    }
+    for _, _, prompt, _, _, title, story in results.records:
+        assert prompt == PROMPT
+        assert title and story
+
+
+@pytest.mark.parametrize("failure_rate", [0.5, 1])
+async def test_batch_counts_failed_requests(failure_rate):
+    user_ids = [uuid4() for _ in range(5)]
+
+    batch, results = await run_batch(
+        create_client(StubFaultsModel(failure_rate=failure_rate)), user_ids
+    )
+
+    assert results.failed == batch.request_counts.failed > 0
+    assert len(results.records) == batch.request_counts.completed
+    assert results.failed + len(results.records) == len(user_ids) * len(COMEDIANS)
+
+
+async def test_copy_stories(engine):
+    user_id = uuid4()
+    async with get_db_session() as session:
+        await session.execute(
+            insert(UsersTable).values(
+                id=user_id,
+                username=f"user-{user_id.hex[:12]}",
+                email=f"{user_id.hex[:12]}@example.com",
+                password=b"",
+            )
+        )
+        await session.commit()
+
+    _, results = await run_batch(create_client(StubFaultsModel()), [user_id])
+    await copy_stories(results.records)
+
+    async with get_db_session() as session:
+        titles = await session.scalars(
+            select(UserPromptsTable.title).where(UserPromptsTable.user_id == user_id)
+        )
+        assert len(titles.all()) == len(COMEDIANS)
@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.api.routes import prompts
+from backend.api.routes.prompts import GENERATE_BATCH_MAX_ITEMS, GenerateBatchFormModel
+
+ITEM = {"prompt": "Un viaje en tren", "comedian": "chiquito_de_la_calzada"}
+
+
+@pytest.mark.parametrize(
+    ("requests_per_minute", "max_items"),
+    [(0, 1), (3, 3), (1000, GENERATE_BATCH_MAX_ITEMS)],
+)
+def test_batch_size_follows_the_user_rate_limit(monkeypatch, requests_per_minute, max_items):
+    monkeypatch.setattr(
+        prompts.openai_settings, "OPENAI_USER_REQUESTS_PER_MINUTE", requests_per_minute
+    )
+
+    assert len(GenerateBatchFormModel(items=[ITEM] * max_items).items) == max_items
+    with pytest.raises(ValidationError):
+        GenerateBatchFormModel(items=[ITEM] * (max_items + 1))
+    with pytest.raises(ValidationError):
+        GenerateBatchFormModel(items=[])
@@ -0,0 +1,143 @@
+"""
+Resilience policy of the LLM client (retries, deadline, circuit breaker), driven against
+the local stub with injected faults.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from backend.api.app import app
+from backend.llm.client import LLMClient
+from backend.llm.resilience import CircuitOpenError, CircuitState, DeadlineExceededError
+from backend.llm.stub import StubFaultsModel, create_stub_app
+from backend.settings.openai import OpenaiSettings
+
+pytestmark = pytest.mark.anyio
+
+MESSAGES = [{"role": "user", "content": "Un viaje en tren"}]
+ESTIMATED_TOKENS = 100
+
+
+class CountingTransport(httpx.ASGITransport):
+    """
+    ASGI transport counting the requests that reached the stub.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await super().handle_async_request(request)
+
+
+def create_client(faults: StubFaultsModel, **settings) -> tuple[LLMClient, CountingTransport]:
+    stub = create_stub_app(latency=0, chunk_delay=0, faults=faults, seed=0)
+    transport = CountingTransport(stub)
+    values = {
+        "OPENAI_API_KEY": "test",
+        "OPENAI_BASE_URL": "http://stub/v1",
+        "OPENAI_RETRY_ATTEMPTS": 3,
+        "OPENAI_RETRY_BACKOFF_SECONDS": 0.001,
+        "OPENAI_RETRY_BACKOFF_MAX_SECONDS": 0.005,
+        "OPENAI_DEADLINE_SECONDS": 5.0,
+        **settings,
+    }
+    return LLMClient(OpenaiSettings(**values), transport=transport), transport
+
+
+@pytest.mark.parametrize("status_code", [500, 503, 429])
+async def test_retries_retryable_errors(status_code):
+    client, transport = create_client(StubFaultsModel(failure_rate=1, failure_status=status_code))
+
+    with pytest.raises(openai.APIStatusError) as error:
+        await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+
+    assert error.value.status_code == status_code
+    assert transport.requests == 3
+    assert client.resilience.retries == 2
+
+
+async def test_does_not_retry_client_errors():
+    client, transport = create_client(StubFaultsModel(failure_rate=1, failure_status=400))
+
+    with pytest.raises(openai.BadRequestError):
+        await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+
+    assert transport.requests == 1
+    assert client.resilience.breaker.failures == 0
+
+
+async def test_recovers_after_transient_errors():
+    client, transport = create_client(StubFaultsModel(failure_rate=0.5))
+
+    for _ in range(10):
+        response = await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+        assert response.choices[0].message.content
+
+    assert client.resilience.retries > 0
+    assert transport.requests == 10 + client.resilience.retries
+
+
+async def test_deadline():
+    client, _ = create_client(
+        StubFaultsModel(slow_rate=1, slow_latency=5),
+        OPENAI_DEADLINE_SECONDS=0.2,
+    )
+
+    with pytest.raises(DeadlineExceededError) as error:
+        await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+
+    assert client.resilience.deadlines_exceeded == 1
+
+    response = await app.exception_handlers[DeadlineExceededError](None, error.value)
+    assert response.status_code == 504
+
+
+async def test_circuit_breaker():
+    client, transport = create_client(
+        StubFaultsModel(failure_rate=1),
+        OPENAI_RETRY_ATTEMPTS=1,
+        OPENAI_CIRCUIT_FAILURE_THRESHOLD=2,
+        OPENAI_CIRCUIT_RESET_SECONDS=0.1,
+    )
+    stub = transport.app
+
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+
+    # Open: fails fast without calling upstream
+    assert client.resilience.breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+    assert transport.requests == 2
+
+    # Half-open: a failed trial call opens it again
+    await asyncio.sleep(0.15)
+    with pytest.raises(openai.InternalServerError):
+        await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+    assert client.resilience.breaker.state == CircuitState.OPEN
+    assert transport.requests == 3
+
+    # Half-open: a successful trial call closes it
+    stub.state.faults = StubFaultsModel()
+    await asyncio.sleep(0.15)
+    await client.create_completion(MESSAGES, ESTIMATED_TOKENS, model="stub")
+    assert client.resilience.breaker.state == CircuitState.CLOSED
+    assert client.resilience.breaker.trips == 2
+
+
+async def test_stream_not_retried_after_first_chunk():
+    client, transport = create_client(StubFaultsModel(stream_cut_rate=1))
+
+    async with client.stream_completion(MESSAGES, ESTIMATED_TOKENS, model="stub") as stream:
+        chunks = [chunk async for chunk in stream]
+
+    assert len(chunks) == 1
+    assert transport.requests == 1
+    assert client.resilience.retries == 0
@@ -0,0 +1,82 @@
+import secrets
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from backend.database.functions import get_db_session
+from backend.database.sessions import reap_expired_sessions
+from backend.database.tables import SessionsTable, UsersTable
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_rejects_empty_batches():
+    with pytest.raises(ValueError):
+        await reap_expired_sessions(0)
+
+
+async def create_sessions(expired: int, valid: int) -> list[str]:
+    user_id = uuid4()
+    now = datetime.now(UTC)
+    sessions = [
+        {
+            "session": secrets.token_urlsafe(32)[:44],
+            "user_id": user_id,
+            "expires": now + timedelta(hours=1 if index >= expired else -1),
+        }
+        for index in range(expired + valid)
+    ]
+
+    async with get_db_session() as session:
+        await session.execute(
+            insert(UsersTable).values(
+                id=user_id,
+                username=f"user-{user_id.hex[:12]}",
+                email=f"{user_id.hex[:12]}@example.com",
+                password=b"",
+            )
+        )
+        await session.execute(insert(SessionsTable).values(sessions))
+        await session.commit()
+
+    return [session["session"] for session in sessions]
+
+
+async def count_sessions(sessions: list[str]) -> int:
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(func.count()).where(SessionsTable.session.in_(sessions))
+        )
+        return result.scalar_one()
+
+
+@pytest.mark.parametrize(
+    "expired, batch_size, deletes",
+    [
+        (7, 3, 3),  # 3 + 3 + 1
+        (6, 3, 3),  # 3 + 3 + an empty batch
+        (0, 3, 1),
+        (2, 1000, 1),
+    ],
+)
+async def test_reaps_expired_sessions_in_batches(engine, expired, batch_size, deletes):
+    # Other tests leave no expired sessions behind, only this test's are reaped
+    sessions = await create_sessions(expired=expired, valid=2)
+
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        if statement.startswith("DELETE"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        deleted = await reap_expired_sessions(batch_size)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    assert deleted == expired
+    assert len(statements) == deletes
+    assert await count_sessions(sessions) == 2
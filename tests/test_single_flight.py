@@ -0,0 +1,90 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from backend.comedians.base import MetaComedian
+from backend.llm.stories import generate_story, story_flights
+
+pytestmark = pytest.mark.anyio
+
+COMEDIAN = MetaComedian.get_comedian("chiquito_de_la_calzada")
+CALLERS = 5
+
+
+class CountingClient:
+    """
+    Fake `LLMClient` counting the upstream calls. Each call takes `delay` seconds, so
+    concurrent callers overlap, and fails with `error` if set.
+    """
+
+    def __init__(self, delay: float = 0.05, error: Exception | None = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def create_completion(self, messages, estimated_tokens, timeout=None, **params):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+        content = json.dumps({"title": "Título", "story": f"Historia {call}"})
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def generate_concurrently(client: CountingClient, prompt: str, use_cache: bool = True):
+    # Different users, so the per user limits don't get in the way
+    return asyncio.gather(
+        *(
+            generate_story(client, COMEDIAN, prompt, uuid4(), use_cache=use_cache)
+            for _ in range(CALLERS)
+        ),
+        return_exceptions=True,
+    )
+
+
+async def test_identical_requests_share_one_upstream_call():
+    client = CountingClient()
+    executions, coalesced = story_flights.executions, story_flights.coalesced
+
+    stories = await generate_concurrently(client, f"Un viaje en tren {uuid4()}")
+
+    assert client.calls == 1
+    assert all(story is stories[0] for story in stories)
+    assert story_flights.executions - executions == 1
+    assert story_flights.coalesced - coalesced == CALLERS - 1
+    assert story_flights.in_flight == 0
+
+
+async def test_identical_requests_share_the_error():
+    client = CountingClient(error=RuntimeError("upstream failed"))
+
+    errors = await generate_concurrently(client, f"Un viaje en tren {uuid4()}")
+
+    assert client.calls == 1
+    assert all(error is client.error for error in errors)
+    assert story_flights.in_flight == 0
+
+
+async def test_uncached_requests_are_not_shared():
+    client = CountingClient()
+
+    stories = await generate_concurrently(client, f"Un viaje en tren {uuid4()}", use_cache=False)
+
+    assert client.calls == CALLERS
+    assert len({story.story for story in stories}) == CALLERS
+
+
+async def test_different_prompts_are_not_shared():
+    client = CountingClient()
+
+    await asyncio.gather(
+        *(generate_story(client, COMEDIAN, f"Prompt {uuid4()}", uuid4()) for _ in range(CALLERS))
+    )
+
+    assert client.calls == CALLERS
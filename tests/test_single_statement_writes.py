@@ -0,0 +1,164 @@
+"""
+The write endpoints run a single statement per request (plus the commit when it
+succeeds), see the user-020 request.
+"""
+
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import event
+
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.functions import get_db_session
+from backend.database.tables import UserPromptsTable
+
+from .api import create_user, new_username, register
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+
+class StatementCounter:
+    """
+    Statements sent to Postgres and transactions committed since the last reset.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.commits = 0
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.commits = 0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def commit(self, conn) -> None:
+        self.commits += 1
+
+
+@pytest.fixture
+def counter(engine):
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter.before_cursor_execute)
+    event.listen(engine.sync_engine, "commit", counter.commit)
+
+    yield counter
+
+    event.remove(engine.sync_engine, "before_cursor_execute", counter.before_cursor_execute)
+    event.remove(engine.sync_engine, "commit", counter.commit)
+
+
+async def test_register(client, counter):
+    counter.reset()
+    response = await register(client, new_username())
+
+    assert response.status_code == 201
+    assert len(counter.statements) == 1
+    assert counter.commits == 1
+
+
+async def test_register_duplicate(client, counter):
+    username = new_username()
+    (await register(client, username)).raise_for_status()
+
+    counter.reset()
+    response = await register(client, username)
+
+    assert response.status_code == 400
+    assert len(counter.statements) == 1
+    assert counter.commits == 0
+
+
+async def test_logout(client, counter):
+    await create_user(client)
+
+    counter.reset()
+    response = await client.post("/auth/logout")
+
+    assert response.status_code == 204
+    assert len(counter.statements) == 1
+    assert counter.commits == 1
+
+
+async def test_update_user_profile(client, counter):
+    username = await create_user(client)
+
+    counter.reset()
+    response = await client.put(
+        "/user_profile",
+        json={"username": username, "email": f"new-{username}@example.com"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["email"] == f"new-{username}@example.com"
+    assert len(counter.statements) == 1
+    assert counter.commits == 1
+
+
+async def test_update_user_profile_duplicate(client, counter):
+    taken = new_username()
+    (await register(client, taken)).raise_for_status()
+    username = await create_user(client)
+
+    counter.reset()
+    response = await client.put(
+        "/user_profile",
+        json={"username": taken, "email": f"{username}@example.com"},
+    )
+
+    assert response.status_code == 400
+    assert len(counter.statements) == 1
+    assert counter.commits == 0
+
+
+async def test_delete_story(client, counter):
+    await create_user(client)
+    user_id = UUID((await client.get("/user_profile")).json()["id"])
+
+    async with get_db_session() as session:
+        story = UserPromptsTable(
+            user_id=user_id,
+            prompt="prompt",
+            date_created=datetime.now(UTC),
+            comedian=ComedianStrEnum.JOSE_MOTA,
+            title="title",
+            story="story",
+        )
+        session.add(story)
+        await session.commit()
+        story_id = story.id
+
+    counter.reset()
+    response = await client.delete(f"/stories/delete/{story_id}")
+
+    assert response.status_code == 204
+    assert len(counter.statements) == 1
+    assert counter.commits == 1
+
+
+async def test_delete_story_not_found(client, counter):
+    await create_user(client)
+
+    counter.reset()
+    response = await client.delete(f"/stories/delete/{uuid4()}")
+
+    assert response.status_code == 404
+    assert len(counter.statements) == 1
+    assert counter.commits == 0
+
+
+async def test_enqueue_job(client, counter):
+    await create_user(client)
+
+    counter.reset()
+    response = await client.post(
+        "/stories/jobs",
+        json={"prompt": "Un viaje en tren", "comedian": ComedianStrEnum.JOSE_MOTA.value},
+    )
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert len(counter.statements) == 1
+    assert counter.commits == 1
@@ -0,0 +1,102 @@
+from base64 import urlsafe_b64encode
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.routes.prompts import decode_history_cursor, encode_history_cursor
+from backend.database.enums.comedians import ComedianStrEnum
+from backend.database.functions import get_db_session
+from backend.database.tables import UserPromptsTable
+
+from .api import create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def test_cursor_round_trip():
+    date_created, story_id = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=UTC), uuid4()
+
+    cursor = encode_history_cursor(date_created, story_id)
+
+    assert decode_history_cursor(cursor) == (date_created, story_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        urlsafe_b64encode(b"\xff\xfe").decode(),
+        urlsafe_b64encode(b"no separator").decode(),
+        urlsafe_b64encode(b"yesterday|not-a-uuid").decode(),
+        urlsafe_b64encode(f"2026-01-01T00:00:00+00:00|{uuid4()}|extra".encode()).decode(),
+    ],
+)
+def test_malformed_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_history_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.usefixtures("engine")
+async def test_history_pages(client):
+    await create_user(client)
+    user_id = UUID((await client.get("/user_profile")).json()["id"])
+
+    # Stories sharing a creation date are ordered by id
+    now = datetime.now(UTC)
+    offsets = [0, 0, 0, 1, 2, 2, 3]
+    dates = [now - timedelta(seconds=offset) for offset in offsets]
+    stories = [
+        UserPromptsTable(
+            user_id=user_id,
+            prompt=f"prompt {index}",
+            date_created=date_created,
+            comedian=ComedianStrEnum.LEO_HARLEM,
+            title=f"title {index}",
+            story=f"story {index}",
+        )
+        for index, date_created in enumerate(dates)
+    ]
+    async with get_db_session() as session:
+        session.add_all(stories)
+        await session.commit()
+
+    expected = [
+        str(story.id)
+        for story in sorted(stories, key=lambda story: (story.date_created, story.id), reverse=True)
+    ]
+
+    ids: list[str] = []
+    cursor = None
+    for _ in range(len(stories)):
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = await client.get("/stories/history/page", params=params)
+        assert response.status_code == 200
+
+        page = response.json()
+        assert len(page["items"]) <= 2
+        ids.extend(item["id"] for item in page["items"])
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == expected
+
+    # The full history keeps its original contract: a list of complete stories
+    response = await client.get("/stories/history")
+    assert response.status_code == 200
+    assert [story["id"] for story in response.json()] == expected
+    assert {"prompt", "story"} <= response.json()[0].keys()
+
+
+@pytest.mark.usefixtures("engine")
+async def test_history_page_invalid_cursor(client):
+    await create_user(client)
+
+    response = await client.get("/stories/history/page", params={"cursor": "not base64!"})
+
+    assert response.status_code == 400
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from backend.llm.parsing import StoryOutputParser, StoryParseError, repair_json
+from backend.llm.stub import stub_story
+
+VALID = '{"title": "Título", "story": "Érase una vez"}'
+STUB_STORY = stub_story([{"role": "user", "content": "Un viaje en tren"}])
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        pytest.param(VALID, VALID, id="valid"),
+        pytest.param(f"```json\n{VALID}\n```", VALID, id="fenced"),
+        pytest.param(f"Aquí tienes:\n{VALID}\nEspero que te guste", VALID, id="surrounding-text"),
+        pytest.param(
+            '{"title": "Título", "story": "Érase una',
+            '{"title": "Título", "story": "Érase una"}',
+            id="truncated-string",
+        ),
+        pytest.param(
+            '{"title": "Título", "story": "Érase\\',
+            '{"title": "Título", "story": "Érase"}',
+            id="truncated-escape",
+        ),
+        pytest.param('{"title": "Título", "story": "Érase una vez"', VALID, id="unclosed-brace"),
+        pytest.param('{"title": "Título", "story": "Érase una vez",', VALID, id="trailing-comma"),
+        pytest.param('{"title": "Título", "story":', '{"title": "Título", "story":""}', id="dangling-key"),
+        pytest.param(
+            '{"title": "{[", "story": "]}"} y más',
+            '{"title": "{[", "story": "]}"}',
+            id="brackets-in-strings",
+        ),
+        pytest.param("No puedo escribir esa historia.", None, id="no-object"),
+    ],
+)
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "repaired"),
+    [
+        pytest.param(VALID, False, id="valid"),
+        pytest.param(f"```json\n{VALID}\n```", True, id="fenced"),
+        pytest.param('{"title": "Título", "story": "Érase una vez",', True, id="trailing-comma"),
+        pytest.param('{"title": "Título", "story": "Érase una vez"', True, id="unclosed-brace"),
+        # The stub's malformed output: fenced and cut at three quarters
+        pytest.param(f"```json\n{STUB_STORY[: len(STUB_STORY) * 3 // 4]}", True, id="stub-malformed"),
+    ],
+)
+def test_parser_repairs_output(text, repaired):
+    parser = StoryOutputParser()
+
+    story = parser.parse(text)
+
+    assert story.title
+    assert story.story
+    assert (parser.outputs, parser.repaired, parser.invalid) == (1, int(repaired), 0)
+
+
+def test_parser_keeps_valid_output_unchanged():
+    story = StoryOutputParser().parse(VALID)
+
+    assert story.model_dump() == json.loads(VALID)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param("No puedo escribir esa historia.", id="no-object"),
+        pytest.param('{"title": "Título"}', id="missing-key"),
+        pytest.param('{"title": " ", "story": "Érase una vez"}', id="empty-title"),
+        pytest.param('{"title": "Título", "story": }', id="broken-value"),
+        pytest.param('{"title": "Título', id="truncated-title"),
+    ],
+)
+def test_parser_rejects_unrepairable_output(text):
+    parser = StoryOutputParser()
+
+    with pytest.raises(StoryParseError):
+        parser.parse(text)
+
+    assert (parser.outputs, parser.repaired, parser.invalid) == (1, 0, 1)
+
+
+def test_parser_rates():
+    parser = StoryOutputParser()
+    parser.parse(VALID)
+    parser.parse(VALID + ",")
+    with pytest.raises(StoryParseError):
+        parser.parse("{}")
+    parser.reasks += 1
+
+    assert parser.stats() == {
+        "outputs": 3,
+        "repaired": 1,
+        "invalid": 1,
+        "reasks": 1,
+        "repair_rate": pytest.approx(1 / 3),
+        "reask_rate": pytest.approx(1 / 3),
+    }
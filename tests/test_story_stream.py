@@ -0,0 +1,73 @@
+import json
+import random
+
+import pytest
+
+from backend.llm.stream import StoryStreamParser
+from backend.llm.stub import stub_story
+
+STORIES = {
+    "stub": stub_story([{"role": "user", "content": "Un viaje en tren"}]),
+    "escapes": json.dumps({"title": 'Dijo "hola"', "story": "Línea 1\nLínea 2\t\\fin/"}),
+    "unicode-escapes": json.dumps({"title": "Jarl 😂", "story": "¿Cóndemor?"}),
+    "extra-keys": '{"mood": "alegre", "title": "Título", "length": 3, "story": "Érase", "tags": ["a"]}',
+    "fenced": '```json\n{"title": "Título", "story": "Érase una vez"}\n```',
+}
+
+
+def split(text: str, rng: random.Random) -> list[str]:
+    cuts = sorted(rng.sample(range(1, len(text)), k=min(len(text) - 1, rng.randint(1, 20))))
+    return [text[start:end] for start, end in zip([0, *cuts], [*cuts, len(text)])]
+
+
+def feed(chunks: list[str]) -> tuple[StoryStreamParser, dict[str, str]]:
+    parser = StoryStreamParser()
+    streamed = {field: "" for field in StoryStreamParser.FIELDS}
+    for chunk in chunks:
+        for field, text in parser.feed(chunk):
+            streamed[field] += text
+    return parser, streamed
+
+
+def expected(raw: str) -> dict[str, str]:
+    decoded = json.loads(raw[raw.index("{") : raw.rindex("}") + 1])
+    return {field: decoded[field] for field in StoryStreamParser.FIELDS}
+
+
+@pytest.mark.parametrize("raw", STORIES.values(), ids=STORIES.keys())
+@pytest.mark.parametrize("seed", range(20))
+def test_random_splits(raw, seed):
+    parser, streamed = feed(split(raw, random.Random(seed)))
+
+    assert streamed == expected(raw)
+    assert parser.values == expected(raw)
+    assert parser.result() == expected(raw)
+
+
+@pytest.mark.parametrize("raw", STORIES.values(), ids=STORIES.keys())
+def test_every_two_chunk_split(raw):
+    for index in range(len(raw) + 1):
+        _, streamed = feed([raw[:index], raw[index:]])
+        assert streamed == expected(raw), index
+
+
+@pytest.mark.parametrize("raw", STORIES.values(), ids=STORIES.keys())
+def test_single_characters(raw):
+    _, streamed = feed(list(raw))
+
+    assert streamed == expected(raw)
+
+
+def test_deltas_of_a_chunk_are_merged_per_field():
+    parser = StoryStreamParser()
+
+    assert parser.feed('{"title": "Tí') == [("title", "Tí")]
+    assert parser.feed('tulo", "story": "Ér') == [("title", "tulo"), ("story", "Ér")]
+    assert parser.feed('ase"}') == [("story", "ase")]
+
+
+def test_truncated_output_keeps_the_streamed_text():
+    parser, streamed = feed(['{"title": "Título", "story": "Érase una', " vez"])
+
+    assert streamed == {"title": "Título", "story": "Érase una vez"}
+    assert parser.result() == streamed
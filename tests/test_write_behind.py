@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from backend.database.tables import UserPromptsTable
+from backend.database.write_behind import WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeInsert:
+    """
+    Stands in for the database insert: records the batches and fails those holding a
+    row in `conflicts` like a constraint would.
+    """
+
+    def __init__(self, conflicts: set[Any] = frozenset(), delay: float = 0.0) -> None:
+        self.conflicts = conflicts
+        self.delay = delay
+        self.batches: list[list[Any]] = []
+
+    async def __call__(self, rows: list[dict[str, Any]]) -> list[SimpleNamespace]:
+        self.batches.append([row["id"] for row in rows])
+        await asyncio.sleep(self.delay)
+        if any(row["id"] in self.conflicts for row in rows):
+            raise IntegrityError("INSERT", rows, Exception("duplicate key"))
+        return [SimpleNamespace(id=row["id"]) for row in rows]
+
+
+def create_buffer(insert_rows, **values) -> WriteBehindBuffer:
+    return WriteBehindBuffer(
+        **{
+            "table": UserPromptsTable,
+            "returning": (UserPromptsTable.id,),
+            "delay": 0.01,
+            "max_batch": 3,
+            "max_pending": 100,
+            "insert_rows": insert_rows,
+            **values,
+        }
+    )
+
+
+async def test_concurrent_rows_are_batched_up_to_max_batch():
+    insert_rows = FakeInsert()
+    buffer = create_buffer(insert_rows)
+    ids = [uuid4() for _ in range(7)]
+
+    rows = await asyncio.gather(*(buffer.insert({"id": id}) for id in ids))
+
+    assert [row.id for row in rows] == ids
+    assert [len(batch) for batch in insert_rows.batches] == [3, 3, 1]
+    assert buffer.stats() == {"rows": 7, "batches": 3, "pending": 0}
+    await buffer.close()
+
+
+async def test_rows_within_the_delay_share_a_batch():
+    insert_rows = FakeInsert()
+    buffer = create_buffer(insert_rows, delay=0.05, max_batch=10)
+
+    async def insert_later(delay: float) -> None:
+        await asyncio.sleep(delay)
+        await buffer.insert({"id": uuid4()})
+
+    await asyncio.gather(insert_later(0), insert_later(0.01))
+    await insert_later(0)
+
+    assert [len(batch) for batch in insert_rows.batches] == [2, 1]
+    await buffer.close()
+
+
+async def test_integrity_error_only_fails_the_offending_row():
+    ids = [uuid4() for _ in range(4)]
+    insert_rows = FakeInsert(conflicts={ids[2]})
+    buffer = create_buffer(insert_rows, max_batch=4)
+
+    results = await asyncio.gather(
+        *(buffer.insert({"id": id}) for id in ids), return_exceptions=True
+    )
+
+    assert isinstance(results[2], IntegrityError)
+    assert [row.id for i, row in enumerate(results) if i != 2] == [ids[0], ids[1], ids[3]]
+    assert insert_rows.batches == [ids, ids[:2], ids[2:], ids[2:3], ids[3:]]
+    await buffer.close()
+
+
+async def test_close_does_not_wait_for_a_dead_task():
+    async def insert_rows(rows):
+        return []  # No row matches its caller: the task fails
+
+    buffer = create_buffer(insert_rows, max_batch=1)
+    inserts = [asyncio.create_task(buffer.insert({"id": uuid4()})) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(buffer.close(), timeout=1)
+
+    results = await asyncio.gather(*inserts, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_close_gives_up_after_the_timeout():
+    buffer = create_buffer(FakeInsert(delay=10), close_timeout=0.05)
+    insert = asyncio.create_task(buffer.insert({"id": uuid4()}))
+    await asyncio.sleep(0.02)
+
+    await asyncio.wait_for(buffer.close(), timeout=1)
+
+    with pytest.raises(RuntimeError):
+        await insert